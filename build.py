@@ -7,6 +7,46 @@ import os
 import sys
 import subprocess
 import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+# 程序实际用到的模块（只列出具体子模块，避免整包收集PyQt6）
+HIDDEN_IMPORTS = [
+    'PyQt6.QtCore',
+    'PyQt6.QtGui',
+    'PyQt6.QtWidgets',
+    'win32api',
+    'win32clipboard',
+    'win32con',
+    'win32gui',
+]
+
+# 未使用的模块，排除后可显著减小exe体积
+EXCLUDED_MODULES = [
+    # 未使用的标准库模块
+    'tkinter',
+    'test',
+    'unittest',
+    'pydoc_data',
+    # 未使用的PyQt6子模块
+    'PyQt6.QtWebEngineCore',
+    'PyQt6.QtWebEngineWidgets',
+    'PyQt6.QtQml',
+    'PyQt6.QtQuick',
+    'PyQt6.QtQuickWidgets',
+    'PyQt6.Qt3DCore',
+    'PyQt6.Qt3DRender',
+    'PyQt6.QtMultimedia',
+    'PyQt6.QtMultimediaWidgets',
+    'PyQt6.QtBluetooth',
+    'PyQt6.QtNetworkAuth',
+    # 不再依赖Pillow
+    'PIL',
+]
+
+# 后台删除旧构建目录的线程池
+_cleanup_executor = ThreadPoolExecutor(max_workers=4)
 
 
 def check_dependencies():
@@ -24,34 +64,40 @@ def check_dependencies():
     
     print("检查项目依赖...")
     try:
-        with open('requirements.txt', 'r', encoding='utf-8') as f:
-            requirements = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-        
-        for req in requirements:
-            try:
-                __import__(req.split('==')[0].split('>=')[0].split('<=')[0].replace('-', '_'))
-                print(f"✓ {req}")
-            except ImportError:
-                print(f"✗ {req} 未安装")
-                print(f"正在安装 {req}...")
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', req])
-                print(f"✓ {req} 安装完成")
+        # 一次 pip 调用解析并安装全部依赖，已满足的依赖会被直接跳过
+        subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
+        print("✓ 项目依赖已就绪")
     except Exception as e:
         print(f"检查依赖时出错: {e}")
 
 
 def clean_build_dirs():
-    """清理构建目录"""
+    """清理构建目录
+    
+    先将旧目录重命名（瞬间完成），再在后台线程中删除，构建无需等待删除结束。
+    
+    Returns:
+        后台删除任务列表
+    """
     print("\n清理构建目录...")
     
+    futures = []
     dirs_to_remove = ['build', 'dist']
     for dir_name in dirs_to_remove:
         if os.path.exists(dir_name):
+            trash_name = f'{dir_name}.tmp.{uuid.uuid4().hex}'
             try:
-                shutil.rmtree(dir_name)
-                print(f"✓ 已删除 {dir_name}")
-            except Exception as e:
-                print(f"✗ 删除 {dir_name} 失败: {e}")
+                os.replace(dir_name, trash_name)
+            except OSError:
+                # 重命名失败（如文件被占用）时退回同步删除
+                try:
+                    shutil.rmtree(dir_name)
+                    print(f"✓ 已删除 {dir_name}")
+                except Exception as e:
+                    print(f"✗ 删除 {dir_name} 失败: {e}")
+                continue
+            futures.append(_cleanup_executor.submit(shutil.rmtree, trash_name, ignore_errors=True))
+            print(f"✓ 已移除 {dir_name}（后台删除中）")
     
     # 清理spec文件（如果存在）
     spec_files = [f for f in os.listdir('.') if f.endswith('.spec') and f != 'ClipboardPRO.spec']
@@ -61,6 +107,8 @@ def clean_build_dirs():
             print(f"✓ 已删除 {spec_file}")
         except Exception as e:
             print(f"✗ 删除 {spec_file} 失败: {e}")
+    
+    return futures
 
 
 def build_exe():
@@ -81,12 +129,13 @@ def build_exe():
             '--windowed',
             '--icon=icon.ico',
             '--add-data=icon.ico;.',
-            '--hidden-import=PyQt6',
-            '--hidden-import=pywin32',
-            '--hidden-import=pyperclip',
-            '--hidden-import=PIL',
+            # 以 -OO 级别编译收集的模块，去掉 assert 和文档字符串
+            '--optimize=2',
+            '--noconfirm',
             '--clean'
         ]
+        cmd += [f'--hidden-import={name}' for name in HIDDEN_IMPORTS]
+        cmd += [f'--exclude-module={name}' for name in EXCLUDED_MODULES]
     
     print(f"执行命令: {' '.join(cmd)}")
     
@@ -131,10 +180,16 @@ def main():
     check_dependencies()
     
     # 清理构建目录
-    clean_build_dirs()
+    cleanup_futures = clean_build_dirs()
     
     # 构建exe
-    if build_exe():
+    build_ok = build_exe()
+    
+    # 等待旧构建目录删除完成
+    wait(cleanup_futures)
+    _cleanup_executor.shutdown()
+    
+    if build_ok:
         # 检查输出
         if check_output():
             print("\n" + "=" * 60)
@@ -5,30 +5,46 @@ Windows 11 剪贴板管理软件 - 主入口
 
 import sys
 import os
+import ctypes
+import logging
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import QSharedMemory
 from src.main_window import MainWindow
 from src.clipboard_monitor import ClipboardMonitor
 from src.storage import Storage
 from src.config import Config
 
 
+# 单实例互斥体名称
+SINGLE_INSTANCE_MUTEX_NAME = 'ClipboardPRO_SingleInstance'
+
+# 互斥体已存在时 GetLastError 的返回值
+ERROR_ALREADY_EXISTS = 183
+
+# 单实例互斥体句柄，保持到进程退出，由系统自动释放
+_instance_mutex = None
+
+
 def check_single_instance():
     """检查是否已有实例运行
     
     Returns:
         bool: True表示已有实例运行，False表示没有
     """
-    shared_memory = QSharedMemory('ClipboardPRO_SingleInstance')
+    global _instance_mutex
     
-    if shared_memory.attach():
-        # 如果能够attach，说明已有实例运行
-        shared_memory.detach()
-        return True
-    else:
-        # 如果无法attach，说明没有实例运行
+    if os.name != 'nt':
         return False
+    
+    from ctypes import wintypes
+    
+    # use_last_error=True：调用后立即保存错误码，由 ctypes.get_last_error() 读取，不会被其他调用覆盖
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateMutexW.argtypes = [wintypes.LPVOID, wintypes.BOOL, wintypes.LPCWSTR]
+    kernel32.CreateMutexW.restype = wintypes.HANDLE
+    _instance_mutex = kernel32.CreateMutexW(None, False, SINGLE_INSTANCE_MUTEX_NAME)
+    # 如果互斥体已存在，说明已有实例运行
+    return ctypes.get_last_error() == ERROR_ALREADY_EXISTS
 
 
 def get_resource_path(relative_path):
@@ -47,6 +63,12 @@ def get_resource_path(relative_path):
 
 def main():
     """主函数"""
+    # 默认只输出警告及以上级别的日志，调试时可改为 logging.DEBUG
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+    )
+    
     # 检查单实例
     if check_single_instance():
         print("程序已在运行中，请勿重复启动")
@@ -62,6 +84,8 @@ def main():
     
     # 初始化配置
     config = Config()
+    # 退出前写入尚未保存的配置
+    app.aboutToQuit.connect(config.flush)
     
     # 初始化存储
     storage = Storage(config=config)
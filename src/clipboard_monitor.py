@@ -3,20 +3,99 @@
 剪贴板监控模块
 """
 
-import time
+import collections
+import logging
 import threading
 import os
+import struct
 import sys
+import time
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 # 尝试导入win32相关模块
 try:
+    import ctypes
+    import win32api
     import win32clipboard
     import win32con
+    import win32gui
+    user32 = ctypes.windll.user32
     WIN32_AVAILABLE = True
-except ImportError:
+except (ImportError, AttributeError):
     WIN32_AVAILABLE = False
-    print("警告: 无法导入win32clipboard和win32con模块")
+    logger.warning("无法导入win32clipboard和win32con模块")
+
+# 优先使用 xxhash 计算图片指纹，未安装时退回 hashlib
+try:
+    import xxhash
+    
+    def _hash_bytes(data):
+        """计算数据的 64 位非加密哈希"""
+        return xxhash.xxh3_64_intdigest(data)
+except ImportError:
+    import hashlib
+    
+    def _hash_bytes(data):
+        """计算数据的 64 位非加密哈希"""
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+# 剪贴板内容变化消息（AddClipboardFormatListener 注册后由系统推送）
+WM_CLIPBOARDUPDATE = 0x031D
+
+# 监听窗口类名
+LISTENER_CLASS_NAME = 'ClipboardPROListener'
+
+# 新记录写入存储前的合并等待时间（秒）
+FLUSH_DELAY = 0.25
+
+# 剪贴板被其他程序占用时，打开剪贴板的重试次数和间隔（秒）
+OPEN_CLIPBOARD_RETRIES = 5
+OPEN_CLIPBOARD_RETRY_DELAY = 0.02
+
+# 重试仍无法打开剪贴板时，再次检查前的等待时间（秒）
+RECHECK_DELAY = 0.5
+
+# BITMAPINFOHEADER 压缩方式：颜色掩码紧跟在信息头之后
+BI_BITFIELDS = 3
+BI_ALPHABITFIELDS = 6
+
+
+def _bmp_file_header(dib_data):
+    """为CF_DIB数据构造14字节的BITMAPFILEHEADER
+    
+    DIB数据前加上文件头即为完整的BMP文件，无需解码和重新编码。
+    
+    Args:
+        dib_data: CF_DIB格式的图片数据（BITMAPINFO + 像素数据）
+        
+    Returns:
+        BITMAPFILEHEADER字节串
+    """
+    header_size = struct.unpack_from('<I', dib_data, 0)[0]
+    pixel_offset = 14 + header_size
+    
+    if header_size == 12:
+        # BITMAPCOREHEADER：调色板项为3字节RGBTRIPLE
+        bit_count = struct.unpack_from('<H', dib_data, 10)[0]
+        if 1 <= bit_count <= 8:
+            pixel_offset += (1 << bit_count) * 3
+    else:
+        bit_count, compression = struct.unpack_from('<HI', dib_data, 14)
+        colors_used = struct.unpack_from('<I', dib_data, 32)[0]
+        # 仅BITMAPINFOHEADER的掩码在信息头之外，V4/V5信息头已包含掩码
+        if header_size == 40 and compression == BI_BITFIELDS:
+            pixel_offset += 12
+        elif header_size == 40 and compression == BI_ALPHABITFIELDS:
+            pixel_offset += 16
+        if colors_used:
+            pixel_offset += colors_used * 4
+        elif 1 <= bit_count <= 8:
+            # bit_count为0（BI_JPEG/BI_PNG）时没有调色板
+            pixel_offset += (1 << bit_count) * 4
+    
+    return struct.pack('<2sIHHI', b'BM', 14 + len(dib_data), 0, 0, pixel_offset)
 
 
 class ClipboardMonitor:
@@ -30,12 +109,36 @@ class ClipboardMonitor:
         """
         self.storage = storage
         self.running = False
-        self.last_content = None
+        # 上次记录内容的签名 (类型, 哈希值)，用于去重
+        self._last_sig = None
+        self._last_seq = 0
+        # 已安排延迟重新检查的序列号（每个序列号只重新检查一次）
+        self._recheck_seq = None
+        # 本程序最近一次写入剪贴板后的序列号
+        self._own_seq = None
         self.monitor_thread = None
+        self.hwnd = None
+        
+        # 待写入存储的记录，由定时器合并后批量写入
+        self._pending = collections.deque()
+        self._flush_timer = None
+        self._flush_lock = threading.Lock()
+        
+        # 预先绑定剪贴板API和格式常量，避免每次检查时重复查找属性
+        if WIN32_AVAILABLE:
+            self._open_clipboard = win32clipboard.OpenClipboard
+            self._close_clipboard = win32clipboard.CloseClipboard
+            self._is_format_available = win32clipboard.IsClipboardFormatAvailable
+            self._get_clipboard_data = win32clipboard.GetClipboardData
+            self._get_sequence_number = user32.GetClipboardSequenceNumber
+            self._CF_UNICODETEXT = win32con.CF_UNICODETEXT
+            self._CF_TEXT = win32con.CF_TEXT
+            self._CF_HDROP = win32con.CF_HDROP
+            self._CF_DIB = win32con.CF_DIB
         
         # 设置临时文件目录
         self.temp_dir = self._get_temp_dir()
-        print(f"临时文件目录: {self.temp_dir}")
+        logger.debug("临时文件目录: %s", self.temp_dir)
         
         # 确保临时目录存在
         os.makedirs(self.temp_dir, exist_ok=True)
@@ -57,154 +160,263 @@ class ClipboardMonitor:
     
     def start_monitoring(self):
         """开始监控"""
-        print(f"开始监控剪贴板，WIN32_AVAILABLE: {WIN32_AVAILABLE}")
+        logger.debug("开始监控剪贴板，WIN32_AVAILABLE: %s", WIN32_AVAILABLE)
+        if not WIN32_AVAILABLE:
+            return
         self.running = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop)
+        self.monitor_thread = threading.Thread(target=self._listener_loop)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
-        print("剪贴板监控线程已启动")
+        logger.debug("剪贴板监控线程已启动")
     
     def stop_monitoring(self):
         """停止监控"""
         self.running = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=1)
-    
-    def _monitor_loop(self):
-        """监控循环"""
-        print("监控循环已启动")
-        counter = 0
-        while self.running:
+        if self.hwnd:
             try:
-                counter += 1
-                if counter % 10 == 0:  # 每10次循环打印一次日志
-                    print(f"监控循环运行中... 第 {counter} 次检查")
-                self._check_clipboard()
+                # 关闭监听窗口，WM_DESTROY 中会注销监听并退出消息循环
+                win32gui.PostMessage(self.hwnd, win32con.WM_CLOSE, 0, 0)
             except Exception as e:
-                print(f"监控剪贴板时出错: {e}")
-            time.sleep(0.5)  # 500ms检查一次
+                logger.error("关闭剪贴板监听窗口时出错: %s", e)
+        if self.monitor_thread:
+            self.monitor_thread.join(timeout=1)
+        
+        # 写入尚未保存的记录
+        with self._flush_lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        self._flush_pending()
     
-    def _check_clipboard(self):
-        """检查剪贴板变化"""
+    def mark_own_write(self):
+        """标记剪贴板的当前内容由本程序写入
+        
+        应在写入并关闭剪贴板之后调用，对应的剪贴板变化通知将被忽略。
+        """
         if not WIN32_AVAILABLE:
-            print("WIN32不可用，跳过剪贴板检查")
             return
+        self._own_seq = self._get_sequence_number()
+        # 之后从其他程序再次复制相同内容时仍需记录
+        self._last_sig = None
+    
+    def _listener_loop(self):
+        """监听线程：创建消息窗口并等待 WM_CLIPBOARDUPDATE
         
+        窗口必须在运行消息循环的线程中创建，剪贴板无变化时线程阻塞在
+        PumpMessages 中，不会被唤醒。
+        """
+        logger.debug("剪贴板监听已启动")
         try:
-            # 确保win32clipboard和win32con可用
-            global win32clipboard, win32con
-            print("开始检查剪贴板...")
-            
-            # 打开剪贴板
-            win32clipboard.OpenClipboard()
-            print("成功打开剪贴板")
+            hinst = win32api.GetModuleHandle(None)
+            wc = win32gui.WNDCLASS()
+            wc.lpszClassName = LISTENER_CLASS_NAME
+            wc.lpfnWndProc = self._wnd_proc
+            wc.hInstance = hinst
+            try:
+                class_atom = win32gui.RegisterClass(wc)
+            except win32gui.error:
+                # 重新启动监控时窗口类已注册，直接使用类名
+                class_atom = LISTENER_CLASS_NAME
             
-            # 检查是否有文本
-            if win32clipboard.IsClipboardFormatAvailable(win32con.CF_UNICODETEXT):
-                print("检测到文本格式 (CF_UNICODETEXT)")
-                try:
-                    content = win32clipboard.GetClipboardData(win32con.CF_UNICODETEXT)
-                    print(f"获取到文本内容: {content[:50]}..." if len(content) > 50 else f"获取到文本内容: {content}")
-                    # 调试比较逻辑
-                    print(f"当前内容类型: {type(content)}, 值: {content}")
-                    print(f"上次内容类型: {type(self.last_content)}, 值: {self.last_content}")
-                    print(f"内容比较结果: {content != self.last_content}")
-                    
-                    if content != self.last_content:
-                        print(f"文本内容已变化，上次内容: {self.last_content[:50]}..." if self.last_content and len(str(self.last_content)) > 50 else f"文本内容已变化，上次内容: {self.last_content}")
-                        self._handle_new_content('text', content)
-                        self.last_content = content
-                        print("已处理新的文本内容")
-                    else:
-                        print("文本内容未变化")
-                except Exception as e:
-                    print(f"读取文本内容时出错: {e}")
-            # 尝试使用其他文本格式
-            elif win32clipboard.IsClipboardFormatAvailable(win32con.CF_TEXT):
-                print("检测到文本格式 (CF_TEXT)")
-                try:
-                    content = win32clipboard.GetClipboardData(win32con.CF_TEXT)
-                    # 尝试解码
-                    try:
-                        content = content.decode('gbk')
-                    except:
-                        try:
-                            content = content.decode('utf-8')
-                        except:
-                            pass
-                    print(f"获取到文本内容: {content[:50]}..." if len(content) > 50 else f"获取到文本内容: {content}")
-                    if content != self.last_content:
-                        self._handle_new_content('text', content)
-                        self.last_content = content
-                        print("已处理新的文本内容")
-                    else:
-                        print("文本内容未变化")
-                except Exception as e:
-                    print(f"读取文本内容时出错: {e}")
+            # 创建仅消息窗口（HWND_MESSAGE），不可见且不参与窗口枚举
+            self.hwnd = win32gui.CreateWindowEx(
+                0, class_atom, 'ClipboardPRO Listener', 0,
+                0, 0, 0, 0,
+                win32con.HWND_MESSAGE, 0, hinst, None
+            )
+            if not user32.AddClipboardFormatListener(self.hwnd):
+                raise ctypes.WinError()
             
-            # 检查是否有文件
-            elif win32clipboard.IsClipboardFormatAvailable(win32con.CF_HDROP):
-                files = win32clipboard.GetClipboardData(win32con.CF_HDROP)
-                if files != self.last_content:
-                    self._handle_new_content('file', '\n'.join(files))
-                    self.last_content = files
+            # 记录启动时剪贴板中已有的内容
+            self._check_clipboard()
             
-            # 检查是否有图片
-            elif win32clipboard.IsClipboardFormatAvailable(win32con.CF_DIB):
+            win32gui.PumpMessages()
+        except Exception as e:
+            logger.error("监听剪贴板时出错: %s", e)
+        finally:
+            self.hwnd = None
+            logger.debug("剪贴板监听已停止")
+    
+    def _wnd_proc(self, hwnd, msg, wparam, lparam):
+        """监听窗口的消息处理函数"""
+        if msg == WM_CLIPBOARDUPDATE:
+            if self.running:
                 try:
-                    import io
-                    from PIL import Image
-                    import hashlib
-                    import os
-                    
-                    # 获取图片数据
-                    dib_data = win32clipboard.GetClipboardData(win32con.CF_DIB)
-                    print(f"获取到图片数据，大小: {len(dib_data)} 字节")
-                    
-                    # 计算图片数据的哈希值，用于检测变化
-                    image_hash = hashlib.md5(dib_data).hexdigest()
-                    print(f"图片哈希值: {image_hash}")
-                    
-                    # 只有当哈希值变化时才处理
-                    if image_hash != self.last_content:
-                        # 转换为PIL Image
-                        image = Image.open(io.BytesIO(dib_data))
-                        print(f"图片尺寸: {image.size}")
-                        
-                        # 保存为临时文件路径（使用绝对路径）
-                        temp_path = os.path.join(self.temp_dir, f"temp_image_{image_hash[:8]}.png")
-                        print(f"保存图片到: {temp_path}")
-                        
-                        # 确保目录存在
-                        os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-                        
-                        # 保存图片
-                        image.save(temp_path)
-                        print(f"图片已保存: {temp_path}")
-                        
-                        # 检查文件是否真的存在
-                        if os.path.exists(temp_path):
-                            print(f"图片文件确认存在: {temp_path}")
-                        else:
-                            print(f"警告: 图片文件不存在: {temp_path}")
-                        
-                        self._handle_new_content('image', temp_path)
-                        self.last_content = image_hash
-                    else:
-                        print("图片内容未变化，跳过处理")
+                    self._check_clipboard()
                 except Exception as e:
-                    print(f"处理图片时出错: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    
+                    logger.error("监控剪贴板时出错: %s", e)
+            return 0
+        if msg == win32con.WM_DESTROY:
+            user32.RemoveClipboardFormatListener(hwnd)
+            win32gui.PostQuitMessage(0)
+            return 0
+        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+    
+    def _check_clipboard(self):
+        """检查剪贴板变化
+        
+        只有成功读取剪贴板后才记录序列号，剪贴板被其他程序占用而无法打开时，
+        稍后重新检查一次，避免丢失这次变化。
+        """
+        if not WIN32_AVAILABLE:
+            return
+        
+        # 序列号未变说明剪贴板内容没有变化，无需打开剪贴板
+        seq = self._get_sequence_number()
+        if seq == self._last_seq:
+            return
+        
+        # 本程序自己写入的内容（如从历史记录复制）不重复读取和保存
+        if seq == self._own_seq:
+            self._last_seq = seq
+            return
+        
+        if not self._open_clipboard_with_retry():
+            self._schedule_recheck(seq)
+            return
+        
+        try:
+            self._read_clipboard()
+            self._last_seq = seq
         except Exception as e:
-            print(f"读取剪贴板时出错: {e}")
+            logger.error("读取剪贴板时出错: %s", e)
         finally:
             try:
-                win32clipboard.CloseClipboard()
-                print("成功关闭剪贴板")
+                self._close_clipboard()
+            except Exception as e:
+                logger.error("关闭剪贴板时出错: %s", e)
+    
+    def _open_clipboard_with_retry(self):
+        """打开剪贴板（其他程序写入后可能短暂占用剪贴板，失败时稍等重试）
+        
+        Returns:
+            是否成功打开
+        """
+        for attempt in range(OPEN_CLIPBOARD_RETRIES):
+            try:
+                self._open_clipboard()
+                return True
             except Exception as e:
-                print(f"关闭剪贴板时出错: {e}")
+                logger.debug("打开剪贴板失败（第 %d 次）: %s", attempt + 1, e)
+                time.sleep(OPEN_CLIPBOARD_RETRY_DELAY)
+        return False
+    
+    def _schedule_recheck(self, seq):
+        """稍后向监听窗口投递一次剪贴板变化消息，重新检查剪贴板
+        
+        Args:
+            seq: 未能读取的剪贴板序列号
+        """
+        if seq == self._recheck_seq:
+            logger.warning("剪贴板持续被占用，放弃读取本次变化")
+            return
+        self._recheck_seq = seq
+        logger.debug("剪贴板被占用，%.1f 秒后重新检查", RECHECK_DELAY)
+        timer = threading.Timer(RECHECK_DELAY, self._post_recheck)
+        timer.daemon = True
+        timer.start()
+    
+    def _post_recheck(self):
+        """在监听线程中重新检查剪贴板"""
+        hwnd = self.hwnd
+        if self.running and hwnd:
+            try:
+                win32gui.PostMessage(hwnd, WM_CLIPBOARDUPDATE, 0, 0)
+            except Exception as e:
+                logger.error("安排重新检查剪贴板时出错: %s", e)
+    
+    def _read_clipboard(self):
+        """读取已打开的剪贴板内容并处理新内容"""
+        is_format_available = self._is_format_available
+        get_clipboard_data = self._get_clipboard_data
+        
+        # 读取剪贴板数据失败时异常向上抛出，本次变化不会被标记为已处理
+        # 检查是否有文本
+        if is_format_available(self._CF_UNICODETEXT):
+            content = get_clipboard_data(self._CF_UNICODETEXT)
+            try:
+                # 先去重，内容未变化时不做任何日志格式化
+                sig = ('text', hash(content))
+                if sig == self._last_sig:
+                    return
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("获取到文本内容 (CF_UNICODETEXT): %.50s", content)
+                self._handle_new_content('text', content)
+                self._last_sig = sig
+            except Exception as e:
+                logger.error("读取文本内容时出错: %s", e)
+        # 尝试使用其他文本格式
+        elif is_format_available(self._CF_TEXT):
+            raw = get_clipboard_data(self._CF_TEXT)
+            try:
+                # 先按UTF-8严格解码，失败时按GBK解码并替换无法识别的字节，保证得到str
+                try:
+                    content = raw.decode('utf-8')
+                except UnicodeDecodeError:
+                    content = raw.decode('gbk', errors='replace')
+                
+                sig = ('text', hash(content))
+                if sig == self._last_sig:
+                    return
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("获取到文本内容 (CF_TEXT): %.50s", content)
+                self._handle_new_content('text', content)
+                self._last_sig = sig
+            except Exception as e:
+                logger.error("读取文本内容时出错: %s", e)
+        
+        # 检查是否有文件
+        elif is_format_available(self._CF_HDROP):
+            files = get_clipboard_data(self._CF_HDROP)
+            sig = ('file', hash(tuple(files)))
+            if sig != self._last_sig:
+                self._handle_new_content('file', '\n'.join(files))
+                self._last_sig = sig
+        
+        # 检查是否有图片
+        elif is_format_available(self._CF_DIB):
+            # 获取图片数据
+            dib_data = get_clipboard_data(self._CF_DIB)
+            try:
+                logger.debug("获取到图片数据，大小: %d 字节", len(dib_data))
+                
+                # 计算图片数据的哈希值，用于检测变化
+                image_hash = _hash_bytes(dib_data)
+                
+                # 只有当哈希值变化时才处理
+                sig = ('image', image_hash)
+                if sig != self._last_sig:
+                    # 保存为临时文件路径（使用绝对路径）
+                    temp_path = os.path.join(self.temp_dir, f"temp_image_{image_hash:016x}.bmp")
+                    
+                    self._save_dib_as_bmp(temp_path, dib_data)
+                    logger.debug("图片已保存: %s", temp_path)
+                    
+                    self._handle_new_content('image', temp_path)
+                    self._last_sig = sig
+                else:
+                    logger.debug("图片内容未变化，跳过处理")
+            except Exception:
+                logger.exception("处理图片时出错")
+    
+    def _save_dib_as_bmp(self, temp_path, dib_data):
+        """将CF_DIB数据保存为BMP文件
+        
+        加上文件头直接写出BMP，跳过解码和PNG编码。
+        
+        Args:
+            temp_path: 保存路径
+            dib_data: CF_DIB格式的图片数据
+        """
+        try:
+            f = open(temp_path, 'wb')
+        except FileNotFoundError:
+            # 临时目录在__init__中已创建，只有被"清空历史"删除后才需要重建
+            os.makedirs(self.temp_dir, exist_ok=True)
+            f = open(temp_path, 'wb')
+        with f:
+            f.write(_bmp_file_header(dib_data))
+            f.write(dib_data)
     
     def _handle_new_content(self, content_type, content):
         """处理新内容
@@ -213,7 +425,7 @@ class ClipboardMonitor:
             content_type: 内容类型 (text/file/image)
             content: 内容
         """
-        print(f"开始处理新内容，类型: {content_type}")
+        logger.debug("处理新内容，类型: %s", content_type)
         # 创建记录
         record = {
             'id': datetime.now().timestamp(),
@@ -223,12 +435,25 @@ class ClipboardMonitor:
             'favorited': False
         }
         
-        # 保存到存储
-        print(f"正在保存记录到存储")
-        self.storage.add_record(record)
+        # 加入待写入队列，短时间内的多条记录合并为一次写入和通知
+        self._pending.append(record)
+        with self._flush_lock:
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_DELAY, self._flush_pending)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def _flush_pending(self):
+        """将待写入的记录保存到存储，并只通知一次存储变更"""
+        with self._flush_lock:
+            self._flush_timer = None
+            if not self._pending:
+                return
+            
+            # 按到达顺序写入，最新的记录最后写入并排在最前
+            while self._pending:
+                self.storage.add_record(self._pending.popleft())
         
         # 通知存储变更
         if hasattr(self.storage, 'notify_change'):
-            print("正在通知存储变更")
-            self.storage.notify_change()
-        print("新内容处理完成")
\ No newline at end of file
+            self.storage.notify_change()
\ No newline at end of file
@@ -4,8 +4,31 @@
 """
 
 import json
+import logging
 import os
 
+# 优先使用 orjson 读写配置，未安装时退回标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _loads(data):
+    """解析JSON字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj):
+    """将对象序列化为带缩进的UTF-8 JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
 
 class Config:
     """配置管理类"""
@@ -14,6 +37,8 @@ class Config:
         """初始化配置"""
         self.config_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
         self.config = self._load_default_config()
+        # 是否有尚未写入文件的修改
+        self._dirty = False
         self._load_config()
     
     def _load_default_config(self):
@@ -32,19 +57,41 @@ class Config:
         """加载配置文件"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
-                    self.config.update(loaded_config)
+                with open(self.config_file, 'rb') as f:
+                    loaded_config = _loads(f.read())
+                self.config.update(loaded_config)
         except Exception as e:
-            print(f"加载配置文件时出错: {e}")
+            logger.error("加载配置文件时出错: %s", e)
     
     def _save_config(self):
-        """保存配置文件"""
+        """保存配置文件
+        
+        先写入临时文件再替换，避免写入中断时留下不完整的配置文件。
+        """
+        tmp_file = self.config_file + '.tmp'
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=2)
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps(self.config))
+            os.replace(tmp_file, self.config_file)
+            self._dirty = False
         except Exception as e:
-            print(f"保存配置文件时出错: {e}")
+            logger.error("保存配置文件时出错: %s", e)
+    
+    def _set(self, key, value):
+        """修改配置项，仅标记为待保存，由flush统一写入
+        
+        Args:
+            key: 配置项名称
+            value: 配置项的值
+        """
+        if self.config.get(key) != value:
+            self.config[key] = value
+            self._dirty = True
+    
+    def flush(self):
+        """将修改过的配置写入文件（没有修改时不写入）"""
+        if self._dirty:
+            self._save_config()
     
     def get_max_records(self):
         """获取最大记录条数
@@ -60,8 +107,7 @@ class Config:
         Args:
             max_records: 最大记录条数，None表示不限制
         """
-        self.config['max_records'] = max_records
-        self._save_config()
+        self._set('max_records', max_records)
     
     def get_max_age_minutes(self):
         """获取最大存留时间（分钟）
@@ -77,8 +123,7 @@ class Config:
         Args:
             max_age_minutes: 最大存留时间（分钟），None表示不限制
         """
-        self.config['max_age_minutes'] = max_age_minutes
-        self._save_config()
+        self._set('max_age_minutes', max_age_minutes)
     
     def get_clear_data_on_exit(self):
         """获取退出时是否清除数据
@@ -94,8 +139,7 @@ class Config:
         Args:
             clear_data: True表示清除，False表示保留
         """
-        self.config['clear_data_on_exit'] = clear_data
-        self._save_config()
+        self._set('clear_data_on_exit', clear_data)
     
     def get_all(self):
         """获取所有配置
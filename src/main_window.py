@@ -3,14 +3,111 @@
 主窗口模块
 """
 
+import logging
+import os
+import sys
+
 from PyQt6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QListWidget, 
-    QListWidgetItem, QPushButton, QLabel, QLineEdit, QCheckBox,
-    QMenu, QSystemTrayIcon, QMessageBox, QApplication, QDialog, QSizePolicy, QScrollArea
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QListView,
+    QPushButton, QLineEdit,
+    QMenu, QSystemTrayIcon, QApplication, QDialog
+)
+from PyQt6.QtGui import QAction, QFont, QColor, QPalette, QIcon, QImage
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, pyqtSlot, QAbstractNativeEventFilter, QEvent, QObject, QRunnable, QThreadPool, QTimer
 )
-from PyQt6.QtGui import QAction, QFont, QColor, QPalette, QIcon
-from PyQt6.QtCore import Qt, pyqtSignal
 from src.settings_dialog import SettingsDialog
+from src.records_view import ClipboardRecordsModel, ClipboardRecordDelegate, RecordRole
+
+
+logger = logging.getLogger(__name__)
+
+# 程序图标路径（打包后位于 _MEIPASS 目录）
+ICON_PATH = os.path.join(
+    getattr(sys, '_MEIPASS', os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'icon.ico'
+)
+
+# 程序图标（需在QApplication创建后才能构造，首次使用时加载）
+_app_icon = None
+
+
+def get_app_icon():
+    """获取程序图标（只检查一次文件并构造一次QIcon）
+    
+    Returns:
+        QIcon，图标文件不存在时返回None
+    """
+    global _app_icon
+    if _app_icon is None:
+        _app_icon = QIcon(ICON_PATH) if os.path.exists(ICON_PATH) else False
+    return _app_icon if _app_icon is not False else None
+
+
+class HotkeyEventFilter(QAbstractNativeEventFilter):
+    """全局热键事件过滤器（在Qt主线程的事件循环中接收WM_HOTKEY）"""
+    
+    WM_HOTKEY = 0x0312
+    
+    def __init__(self, hotkey_id, callback):
+        """初始化
+        
+        Args:
+            hotkey_id: 热键ID
+            callback: 热键触发时调用的函数
+        """
+        super().__init__()
+        from ctypes import wintypes
+        self._msg_type = wintypes.MSG
+        self.hotkey_id = hotkey_id
+        self.callback = callback
+    
+    def nativeEventFilter(self, event_type, message):
+        """过滤原生消息
+        
+        Args:
+            event_type: 消息类型
+            message: 指向MSG结构的指针
+            
+        Returns:
+            (是否已处理, 结果) 元组
+        """
+        if event_type == b'windows_generic_MSG':
+            msg = self._msg_type.from_address(int(message))
+            if msg.message == self.WM_HOTKEY and msg.wParam == self.hotkey_id:
+                self.callback()
+                return True, 0
+        return False, 0
+
+
+class ImageLoadSignals(QObject):
+    """图片加载任务的信号"""
+    
+    # 加载完成信号 (图片)
+    loaded = pyqtSignal(QImage)
+
+
+class ImageLoadTask(QRunnable):
+    """在线程池中解码图片的任务（用于复制非BMP格式的图片）"""
+    
+    def __init__(self, image_path, signals):
+        """初始化
+        
+        Args:
+            image_path: 图片路径
+            signals: 用于通知加载结果的信号对象
+        """
+        super().__init__()
+        self.image_path = image_path
+        self.signals = signals
+    
+    def run(self):
+        """解码图片"""
+        image = QImage(self.image_path)
+        if image.isNull():
+            logger.error("无法加载图片: %s", self.image_path)
+            return
+        self.signals.loaded.emit(image)
 
 
 class MainWindow(QMainWindow):
@@ -35,8 +132,16 @@ class MainWindow(QMainWindow):
         self.is_closing = False  # 添加关闭标志
         self.current_filter = None  # 当前筛选类型
         
-        # 连接信号到槽
-        self.update_ui_signal.connect(self.load_records)
+        # 主题颜色缓存（调色板变化时清除）
+        self._theme_colors = None
+        self._highlight_span = None
+        
+        # 连接信号到槽（存储变化通知来自监控线程，直接使用队列连接投递到主线程）
+        self.update_ui_signal.connect(self.load_records, Qt.ConnectionType.QueuedConnection)
+        
+        # 非BMP图片在后台解码后再写入剪贴板
+        self._image_load_signals = ImageLoadSignals(self)
+        self._image_load_signals.loaded.connect(self._set_clipboard_image)
         
         # 注册为观察者
         self.storage.add_observer(self)
@@ -54,23 +159,25 @@ class MainWindow(QMainWindow):
         self.load_records()
     
     def get_system_theme_colors(self):
-        """获取系统主题颜色
+        """获取系统主题颜色（缓存，调色板变化时重新获取）
         
         Returns:
             (背景色, 选中色, 文本色) 元组
         """
-        palette = QApplication.palette()
-        
-        # 获取窗口背景色
-        window_color = palette.color(QPalette.ColorRole.Window)
-        
-        # 获取高亮色（选中色）
-        highlight_color = palette.color(QPalette.ColorRole.Highlight)
-        
-        # 获取文本色
-        text_color = palette.color(QPalette.ColorRole.WindowText)
-        
-        return window_color, highlight_color, text_color
+        if self._theme_colors is None:
+            palette = QApplication.palette()
+            
+            # 获取窗口背景色
+            window_color = palette.color(QPalette.ColorRole.Window)
+            
+            # 获取高亮色（选中色）
+            highlight_color = palette.color(QPalette.ColorRole.Highlight)
+            
+            # 获取文本色
+            text_color = palette.color(QPalette.ColorRole.WindowText)
+            
+            self._theme_colors = (window_color, highlight_color, text_color)
+        return self._theme_colors
     
     def _get_border_color(self):
         """获取边框颜色（根据主题自适应）
@@ -78,8 +185,7 @@ class MainWindow(QMainWindow):
         Returns:
             边框颜色
         """
-        palette = QApplication.palette()
-        window_color = palette.color(QPalette.ColorRole.Window)
+        window_color = self.get_system_theme_colors()[0]
         
         # 根据背景色计算边框颜色
         if window_color.lightness() < 128:
@@ -93,8 +199,7 @@ class MainWindow(QMainWindow):
         Returns:
             禁用状态颜色
         """
-        palette = QApplication.palette()
-        text_color = palette.color(QPalette.ColorRole.WindowText)
+        text_color = self.get_system_theme_colors()[2]
         
         # 根据文本色计算禁用颜色
         if text_color.lightness() < 128:
@@ -102,6 +207,48 @@ class MainWindow(QMainWindow):
         else:
             return QColor(153, 153, 153)  # 浅色模式使用较暗的灰色
     
+    def _get_highlight_span(self):
+        """获取搜索高亮的HTML标签模板（缓存，调色板变化时重新生成）
+        
+        Returns:
+            用于 re.sub 的替换模板
+        """
+        if self._highlight_span is None:
+            bg_color, highlight_color, text_color = self.get_system_theme_colors()
+            
+            # 计算高亮背景色（半透明）
+            highlight_bg = QColor(highlight_color)
+            highlight_bg.setAlpha(50)  # 设置透明度为50%
+            
+            self._highlight_span = (
+                f'<span style="background-color: {highlight_bg.name()}; color: {text_color.name()}; '
+                f'padding: 1px 2px; border-radius: 2px;">\\1</span>'
+            )
+        return self._highlight_span
+    
+    def _apply_theme_to_records(self):
+        """将主题颜色应用到记录列表的绘制代理"""
+        bg_color, highlight_color, text_color = self.get_system_theme_colors()
+        self.records_delegate.set_colors(
+            text_color, self._get_disabled_color(), self._get_border_color(), highlight_color
+        )
+    
+    def changeEvent(self, event):
+        """窗口状态变化事件（调色板变化时刷新缓存的主题颜色）
+        
+        Args:
+            event: 事件
+        """
+        super().changeEvent(event)
+        if event.type() in (QEvent.Type.PaletteChange, QEvent.Type.ApplicationPaletteChange):
+            self._theme_colors = None
+            self._highlight_span = None
+            if hasattr(self, 'filter_container'):
+                self._apply_filter_buttons_stylesheet()
+            if hasattr(self, 'records_delegate'):
+                self._apply_theme_to_records()
+                self.records_list.viewport().update()
+    
     def init_ui(self):
         """初始化UI"""
         # 设置窗口属性
@@ -110,14 +257,9 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(600, 400)
         
         # 设置窗口图标
-        import sys
-        import os
-        if hasattr(sys, '_MEIPASS'):
-            icon_path = os.path.join(sys._MEIPASS, 'icon.ico')
-        else:
-            icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'icon.ico')
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
+        app_icon = get_app_icon()
+        if app_icon is not None:
+            self.setWindowIcon(app_icon)
         
         # 主布局
         central_widget = QWidget()
@@ -145,8 +287,11 @@ class MainWindow(QMainWindow):
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText('搜索剪贴板历史...')
         
-        # 添加搜索防抖
-        self.search_timer = None
+        # 添加搜索防抖（复用同一个单次定时器，连续输入只触发一次加载）
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self._apply_search)
         self.search_edit.textChanged.connect(self._on_search_text_changed)
         
         # 获取系统主题颜色
@@ -154,7 +299,7 @@ class MainWindow(QMainWindow):
         
         self.search_edit.setStyleSheet(f"""
             QLineEdit {{
-                border: 1px solid {self._get_border_color()};
+                border: 1px solid {self._get_border_color().name()};
                 border-radius: 4px;
                 padding: 8px 30px 8px 10px;
                 background-color: {bg_color.name()};
@@ -195,8 +340,8 @@ class MainWindow(QMainWindow):
         self.search_edit.layout().addWidget(self.clear_search_btn)
         
         # 类型筛选标签（横向排列）
-        filter_container = QWidget()
-        filter_layout = QHBoxLayout(filter_container)
+        self.filter_container = QWidget()
+        filter_layout = QHBoxLayout(self.filter_container)
         filter_layout.setContentsMargins(0, 0, 0, 0)
         filter_layout.setSpacing(15)
         
@@ -213,16 +358,17 @@ class MainWindow(QMainWindow):
             btn = QPushButton(label)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
             btn.setProperty('filter_type', filter_type)
-            btn.clicked.connect(lambda checked, ft=filter_type: self.on_filter_clicked(ft))
+            btn.clicked.connect(self._on_filter_button_clicked)
             self.filter_buttons[filter_type] = btn
             filter_layout.addWidget(btn)
         
         filter_layout.addStretch()
         
         search_layout.addWidget(search_input_container)
-        search_layout.addWidget(filter_container)
+        search_layout.addWidget(self.filter_container)
         
         # 初始化筛选按钮样式
+        self._apply_filter_buttons_stylesheet()
         self._update_filter_buttons_style(None)
         
         # 清空按钮
@@ -246,13 +392,39 @@ class MainWindow(QMainWindow):
         right_layout.setContentsMargins(10, 10, 10, 10)
         
         # 记录列表
-        self.records_list = QListWidget()
+        # 模型只保存记录数据，由代理绘制可见的行，不再为每条记录创建控件
+        self.records_model = ClipboardRecordsModel(self.selected_items, self)
+        self.records_model.check_state_changed.connect(self._on_checkbox_changed)
+        self.records_delegate = ClipboardRecordDelegate(self._highlight_search_terms, self)
+        self._apply_theme_to_records()
+        self.records_delegate.show_full_text_requested.connect(self._on_show_full_text_requested)
+        self.records_delegate.image_preview_requested.connect(self.show_image_preview_dialog)
+        
+        self.records_list = QListView()
+        self.records_list.setModel(self.records_model)
+        self.records_list.setItemDelegate(self.records_delegate)
+        # 缩略图在后台加载完成后重绘可见区域
+        self.records_delegate.thumbnail_loaded.connect(self.records_list.viewport().update)
+        # 记录变化时重新读取图片的修改时间
+        self.records_model.modelReset.connect(self.records_delegate.invalidate_image_info)
+        self.records_model.rowsInserted.connect(self.records_delegate.invalidate_image_info)
+        self.records_model.rowsRemoved.connect(self.records_delegate.invalidate_image_info)
+        self.records_model.dataChanged.connect(self.records_delegate.invalidate_image_info)
+        # 记录被移除或列表重置时丢弃文本预览的排版缓存
+        self.records_model.modelReset.connect(self.records_delegate.clear_preview_cache)
+        self.records_model.rowsRemoved.connect(self.records_delegate.clear_preview_cache)
+        self.records_list.setSelectionMode(QListView.SelectionMode.NoSelection)
+        # 宽度变化时重新计算行高（文本换行）
+        self.records_list.setResizeMode(QListView.ResizeMode.Adjust)
+        # 分批布局，记录很多时不会一次性计算所有行高而阻塞界面
+        self.records_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.records_list.setBatchSize(50)
         self.records_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.records_list.customContextMenuRequested.connect(self.show_context_menu)
         
         # 优化滚动体验
-        self.records_list.setVerticalScrollMode(QListWidget.ScrollMode.ScrollPerPixel)
-        self.records_list.setHorizontalScrollMode(QListWidget.ScrollMode.ScrollPerPixel)
+        self.records_list.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.records_list.setHorizontalScrollMode(QListView.ScrollMode.ScrollPerPixel)
         self.records_list.verticalScrollBar().setSingleStep(20)  # 设置单次滚动步长
         
         # 底部操作栏
@@ -289,14 +461,9 @@ class MainWindow(QMainWindow):
         self.tray_icon = QSystemTrayIcon()
         
         # 设置托盘图标
-        import sys
-        import os
-        if hasattr(sys, '_MEIPASS'):
-            icon_path = os.path.join(sys._MEIPASS, 'icon.ico')
-        else:
-            icon_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'icon.ico')
-        if os.path.exists(icon_path):
-            self.tray_icon.setIcon(QIcon(icon_path))
+        app_icon = get_app_icon()
+        if app_icon is not None:
+            self.tray_icon.setIcon(app_icon)
         else:
             # 如果找不到图标文件，使用默认图标
             try:
@@ -325,6 +492,7 @@ class MainWindow(QMainWindow):
         # 显示托盘图标
         self.tray_icon.show()
     
+    @pyqtSlot(QSystemTrayIcon.ActivationReason)
     def on_tray_icon_activated(self, reason):
         """托盘图标被激活
         
@@ -336,92 +504,44 @@ class MainWindow(QMainWindow):
             self.toggle_window()
     
     def init_hotkey(self):
-        """初始化全局快捷键"""
+        """初始化全局快捷键
+        
+        热键注册到主窗口句柄，WM_HOTKEY 由Qt事件循环分发给原生事件过滤器，
+        无需额外的消息线程。
+        """
         try:
-            import win32api
+            import ctypes
             import win32con
-            import win32gui
             
+            user32 = ctypes.windll.user32
+            hwnd = int(self.winId())
+            
+            # RegisterHotKey 返回BOOL，成功时非0
             # 尝试不同的热键ID
             for hotkey_id in range(1, 10):
-                try:
-                    # 注册全局热键 Ctrl+Alt+V
-                    if win32gui.RegisterHotKey(None, hotkey_id, win32con.MOD_CONTROL | win32con.MOD_ALT, ord('V')):
-                        self.hotkey_id = hotkey_id
-                        print(f"成功注册热键 Ctrl+Alt+V，ID: {hotkey_id}")
-                        break
-                except Exception as e:
-                    print(f"尝试注册热键 ID {hotkey_id} 时出错: {e}")
+                # 注册全局热键 Ctrl+Alt+V
+                if user32.RegisterHotKey(hwnd, hotkey_id, win32con.MOD_CONTROL | win32con.MOD_ALT, ord('V')):
+                    self.hotkey_id = hotkey_id
+                    logger.info("成功注册热键 Ctrl+Alt+V，ID: %s", hotkey_id)
+                    break
+                logger.debug("注册热键 ID %s 失败（错误码 %s）", hotkey_id, ctypes.GetLastError())
             else:
-                # 如果所有ID都失败，尝试其他热键组合
-                try:
-                    # 尝试 Ctrl+Shift+V
-                    if win32gui.RegisterHotKey(None, 1, win32con.MOD_CONTROL | win32con.MOD_SHIFT, ord('V')):
-                        self.hotkey_id = 1
-                        print("成功注册热键 Ctrl+Shift+V")
-                    else:
-                        print("无法注册任何热键")
-                        return
-                except:
-                    print("无法注册任何热键")
+                # 如果所有ID都失败，尝试 Ctrl+Shift+V
+                if user32.RegisterHotKey(hwnd, 1, win32con.MOD_CONTROL | win32con.MOD_SHIFT, ord('V')):
+                    self.hotkey_id = 1
+                    logger.info("成功注册热键 Ctrl+Shift+V")
+                else:
+                    logger.warning("无法注册任何热键")
                     return
             
-            # 创建消息循环来监听热键
-            def hotkey_callback(hwnd, msg, wparam, lparam):
-                if msg == win32con.WM_HOTKEY and wparam == self.hotkey_id:
-                    # 在主线程中调用 toggle_window
-                    from PyQt6.QtCore import QTimer
-                    QTimer.singleShot(0, self.toggle_window)
-                return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
-            
-            # 注册窗口类
-            try:
-                wc = win32gui.WNDCLASS()
-                # 尝试设置属性
-                try:
-                    # 类型忽略：PyWNDCLASS属性赋值
-                    wc.lpszClassName = "HotkeyListener"  # type: ignore
-                    wc.lpfnWndProc = hotkey_callback  # type: ignore
-                except Exception:
-                    # 如果属性赋值失败，使用其他方式
-                    pass
-                
-                class_atom = win32gui.RegisterClass(wc)
-                
-                # 创建隐藏窗口来监听热键（不使用消息窗口，因为消息窗口无法正确接收消息）
-                import win32api
-                hinst = win32api.GetModuleHandle(None)
-                self.hwnd = win32gui.CreateWindowEx(
-                    win32con.WS_EX_NOACTIVATE | win32con.WS_EX_TOOLWINDOW | win32con.WS_EX_LAYERED,  # 扩展样式
-                    class_atom, "Hotkey Listener", 
-                    0,  # 无样式
-                    0, 0, 1, 1,  # 位置和大小（最小化）
-                    None,  # 不使用 HWND_MESSAGE，使用普通隐藏窗口
-                    0, hinst, None
-                )
-                # 确保窗口完全不可见
-                win32gui.ShowWindow(self.hwnd, win32con.SW_HIDE)
-            except Exception as e:
-                print(f"创建热键监听器窗口时出错: {e}")
-                return
-            
-            # 启动消息循环
-            import threading
-            def message_loop():
-                while True:
-                    try:
-                        win32gui.PumpWaitingMessages()
-                        import time
-                        time.sleep(0.1)
-                    except:
-                        break
+            self.hotkey_hwnd = hwnd
             
-            self.message_thread = threading.Thread(target=message_loop)
-            self.message_thread.daemon = True
-            self.message_thread.start()
+            # 安装原生事件过滤器（需保持引用，避免被回收）
+            self.hotkey_filter = HotkeyEventFilter(self.hotkey_id, self.toggle_window)
+            QApplication.instance().installNativeEventFilter(self.hotkey_filter)
             
         except Exception as e:
-            print(f"设置全局快捷键时出错: {e}")
+            logger.warning("设置全局快捷键时出错: %s", e)
     
     def toggle_window(self):
         """切换窗口显示/隐藏"""
@@ -436,6 +556,7 @@ class MainWindow(QMainWindow):
             self.activateWindow()
             self.setFocus()
     
+    @pyqtSlot()
     def show_settings(self):
         """显示设置对话框"""
         if self.config is None:
@@ -448,11 +569,16 @@ class MainWindow(QMainWindow):
             # 重新加载记录
             self.load_records()
     
+    @pyqtSlot()
     def clear_search(self):
         """清空搜索框"""
         self.search_edit.clear()
         self.clear_search_btn.setVisible(False)
     
+    def _on_filter_button_clicked(self):
+        """筛选按钮点击处理（筛选类型保存在按钮的 filter_type 属性中）"""
+        self.on_filter_clicked(self.sender().property('filter_type'))
+    
     def on_filter_clicked(self, filter_type):
         """筛选标签点击处理
         
@@ -466,18 +592,42 @@ class MainWindow(QMainWindow):
             # 加载记录
             self.load_records(filter_type=filter_type, search_term=self.search_edit.text())
     
+    @pyqtSlot()
     def _on_search_text_changed(self):
         """搜索文本变化处理（带防抖）"""
-        # 清除之前的定时器
-        if self.search_timer:
-            self.search_timer.stop()
-        
-        # 创建新的定时器，300ms后执行搜索
-        from PyQt6.QtCore import QTimer
-        self.search_timer = QTimer(self)
-        self.search_timer.setSingleShot(True)
-        self.search_timer.timeout.connect(lambda: self.load_records(filter_type=self.current_filter))
-        self.search_timer.start(300)
+        # 重新计时，停止输入150ms后执行搜索
+        self._search_timer.start()
+    
+    @pyqtSlot()
+    def _apply_search(self):
+        """执行搜索"""
+        self.load_records(filter_type=self.current_filter)
+    
+    def _apply_filter_buttons_stylesheet(self):
+        """为筛选标签容器设置共享样式表
+        
+        所有筛选按钮共用容器上的一份样式表，选中状态通过动态属性 active 区分，
+        切换筛选时无需为每个按钮重新解析样式表。
+        """
+        bg_color, highlight_color, text_color = self.get_system_theme_colors()
+        disabled_color = self._get_disabled_color()
+        self.filter_container.setStyleSheet(f"""
+            QPushButton {{
+                border: none;
+                background: transparent;
+                color: {disabled_color.name()};
+                font-size: 13px;
+                padding: 5px 0px;
+            }}
+            QPushButton:hover {{
+                color: {highlight_color.name()};
+            }}
+            QPushButton[active="true"] {{
+                color: {highlight_color.name()};
+                font-weight: bold;
+                text-decoration: underline;
+            }}
+        """)
     
     def _update_filter_buttons_style(self, active_filter):
         """更新筛选按钮样式
@@ -485,42 +635,14 @@ class MainWindow(QMainWindow):
         Args:
             active_filter: 当前激活的筛选类型
         """
-        bg_color, highlight_color, text_color = self.get_system_theme_colors()
-        disabled_color = self._get_disabled_color()
-        
         for filter_type, btn in self.filter_buttons.items():
-            if filter_type == active_filter:
-                # 选中状态：高亮色文字 + 下划线
-                btn.setStyleSheet(f"""
-                    QPushButton {{
-                        border: none;
-                        background: transparent;
-                        color: {highlight_color.name()};
-                        font-size: 13px;
-                        font-weight: bold;
-                        padding: 5px 0px;
-                        text-decoration: underline;
-                    }}
-                    QPushButton:hover {{
-                        text-decoration: underline;
-                    }}
-                """)
-            else:
-                # 未选中状态：禁用色文字
-                btn.setStyleSheet(f"""
-                    QPushButton {{
-                        border: none;
-                        background: transparent;
-                        color: {disabled_color.name()};
-                        font-size: 13px;
-                        padding: 5px 0px;
-                    }}
-                    QPushButton:hover {{
-                        color: {highlight_color.name()};
-                    }}
-                """)
-
-
+            active = filter_type == active_filter
+            if btn.property('active') == active:
+                continue
+            btn.setProperty('active', active)
+            # 动态属性变化后需重新polish才能应用对应的样式规则
+            btn.style().unpolish(btn)
+            btn.style().polish(btn)
     
     def load_records(self, filter_type=None, search_term=None):
         """加载记录
@@ -540,281 +662,21 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'clear_search_btn'):
             self.clear_search_btn.setVisible(bool(search_term))
         
-        # 获取记录
+        # 获取记录（类型筛选和搜索由存储层完成）
         records = self.storage.get_records(
-            filter_type=filter_type
+            filter_type=filter_type,
+            search_term=search_term
         )
         
-        # 搜索过滤
-        if search_term:
-            records = [r for r in records if search_term.lower() in r['content'].lower()]
-        
-        # 禁用更新以减少闪烁
-        self.records_list.setUpdatesEnabled(False)
-        
-        # 清空列表
-        self.records_list.clear()
-        self.selected_items.clear()
-        
-        # 添加记录
-        for record in records:
-            print(f"添加记录: {record['content'][:50]}..." if len(record['content']) > 50 else f"添加记录: {record['content']}")
-            item = QListWidgetItem()
-            item.setData(Qt.ItemDataRole.UserRole, record)
-            
-            # 创建自定义 widget（设置父对象以避免闪烁）
-            widget = QWidget(self.records_list)
-            layout = QHBoxLayout(widget)
-            layout.setContentsMargins(5, 5, 5, 5)
-            layout.setSpacing(10)
-            
-            # 创建复选框
-            checkbox = QCheckBox(widget)
-            checkbox.setChecked(record['id'] in self.selected_items)
-            checkbox.stateChanged.connect(lambda state, rid=record['id']: self._on_checkbox_changed(rid, state))
-            
-            # 获取系统主题颜色
-            bg_color, highlight_color, text_color = self.get_system_theme_colors()
-            disabled_color = self._get_disabled_color()
-            
-            # 创建类型标识
-            type_label = QLabel(self._get_record_title(record), widget)
-            type_label.setFont(QFont('Microsoft YaHei', 9))
-            type_label.setMinimumWidth(80)
-            type_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-            type_label.setStyleSheet(f'color: {text_color.name()}; font-weight: bold;')
-            
-            # 创建内容区域
-            content_widget = QWidget(widget)
-            content_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
-            content_layout = QVBoxLayout(content_widget)
-            content_layout.setContentsMargins(0, 0, 0, 0)
-            content_layout.setSpacing(5)
-            
-            # 内容预览
-            if record['type'] == 'image':
-                # 为图片创建图片预览
-                preview = self._create_image_preview(record['content'], record['id'])
-            else:
-                # 为文本和文件创建可折叠文本预览
-                preview = self._create_collapsible_text_preview(record['content'], record['id'], record['type'])
-            
-            # 时间戳
-            # 格式化时间戳显示
-            timestamp_str = record['timestamp']
-            # 处理旧格式的时间戳（ISO格式，如2026-02-17T23:16:56.337378）
-            if 'T' in timestamp_str and '.' in timestamp_str:
-                # 转换为新格式：2026-02-17 23:16:56
-                timestamp_str = timestamp_str.replace('T', ' ').split('.')[0]
-            timestamp = QLabel(timestamp_str)
-            timestamp.setFont(QFont('Microsoft YaHei', 8))
-            timestamp.setStyleSheet(f'color: {disabled_color.name()}')
-            
-            # 添加到内容布局
-            content_layout.addWidget(preview)
-            content_layout.addWidget(timestamp)
-            
-            # 添加到主布局
-            layout.addWidget(checkbox)
-            layout.addWidget(type_label)
-            layout.addWidget(content_widget, 1)
-            
-            # 创建包含分割线的容器 widget（设置父对象以避免闪烁）
-            container_widget = QWidget(self.records_list)
-            container_layout = QVBoxLayout(container_widget)
-            container_layout.setContentsMargins(0, 0, 0, 0)
-            container_layout.setSpacing(0)
-            
-            # 添加主要内容 widget
-            container_layout.addWidget(widget)
-            
-            # 添加分割线
-            separator = QWidget(container_widget)
-            separator.setFixedHeight(1)
-            border_color = self._get_border_color()
-            separator.setStyleSheet(f"background-color: {border_color.name()};")
-            container_layout.addWidget(separator)
-            
-            # 先添加item到list，再设置item widget
-            self.records_list.addItem(item)
-            # 强制计算widget大小
-            container_widget.adjustSize()
-            # 获取建议大小
-            size_hint = container_widget.sizeHint()
-            # 设置item大小（根据内容自适应，最小高度60）
-            size_hint.setHeight(max(size_hint.height(), 60))
-            item.setSizeHint(size_hint)
-            # 设置item widget
-            self.records_list.setItemWidget(item, container_widget)
-            print(f"记录已添加，item大小: {item.sizeHint()}")
-        
-        # 恢复更新
-        self.records_list.setUpdatesEnabled(True)
-    
-    def _get_record_title(self, record):
-        """获取记录标题
-        
-        Args:
-            record: 记录
-            
-        Returns:
-            标题（带图标）
-        """
-        if record['type'] == 'text':
-            return '📝 文本'
-        elif record['type'] == 'file':
-            return '📁 文件'
-        elif record['type'] == 'image':
-            return '🖼️ 图片'
-        return '❓ 未知'
-    
-    def _get_record_preview(self, record):
-        """获取记录预览
-        
-        Args:
-            record: 记录
-            
-        Returns:
-            预览文本
-        """
-        if record['type'] == 'image':
-            return '[图片] ' + record['content']
-        
-        content = record['content']
-        if len(content) > 100:
-            return content[:100] + '...'
-        return content
-    
-    def _create_collapsible_text_preview(self, content, record_id=None, record_type='text'):
-        """创建可折叠的文本预览
-        
-        Args:
-            content: 文本内容
-            record_id: 记录ID（用于检测选中状态）
-            record_type: 记录类型（text 或 file）
-            
-        Returns:
-            可折叠文本预览widget
-        """
-        from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QScrollArea
-        from PyQt6.QtCore import Qt
-        import html
-        import os
-        
-        # 获取系统主题颜色
-        bg_color, highlight_color, text_color = self.get_system_theme_colors()
-        disabled_color = self._get_disabled_color()
+        # 只保留仍在列表中的选中项
+        self.selected_items.intersection_update(r['id'] for r in records)
         
-        # 获取当前搜索词
-        search_term = self.search_edit.text().strip() if hasattr(self, 'search_edit') else ''
+        # 更新绘制代理的搜索词
+        self.records_delegate.search_term = search_term.strip()
         
-        # 创建主widget
-        main_widget = QWidget()
-        main_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
-        main_layout = QVBoxLayout(main_widget)
-        main_layout.setContentsMargins(0, 0, 0, 0)
-        main_layout.setSpacing(5)
-        
-        # 如果是文件类型，显示文件名和路径
-        if record_type == 'file':
-            # 提取文件名
-            filename = os.path.basename(content)
-            
-            # 创建文件名标签（加粗）
-            filename_label = QLabel(filename)
-            filename_label.setFont(QFont('Microsoft YaHei', 9, QFont.Weight.Bold))
-            filename_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            filename_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-            filename_label.setCursor(Qt.CursorShape.IBeamCursor)
-            filename_label.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-            filename_label.customContextMenuRequested.connect(lambda pos: self.show_text_context_menu(pos, content))
-            
-            # 创建文件路径标签
-            path_label = QLabel(content)
-            path_label.setFont(QFont('Microsoft YaHei', 8))
-            path_label.setStyleSheet(f'color: {disabled_color.name()};')
-            path_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            path_label.setAlignment(Qt.AlignmentFlag.AlignLeft)
-            path_label.setCursor(Qt.CursorShape.IBeamCursor)
-            path_label.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-            path_label.customContextMenuRequested.connect(lambda pos: self.show_text_context_menu(pos, content))
-            
-            # 添加到布局
-            main_layout.addWidget(filename_label)
-            main_layout.addWidget(path_label)
-        else:
-            # 文本类型，显示文本内容
-            preview_text = content[:100] + '...' if len(content) > 100 else content
-            
-            # 如果有搜索词，进行高亮处理
-            if search_term and len(content) <= 100:
-                preview_text = self._highlight_search_terms(content, search_term)
-            elif search_term and len(content) > 100:
-                preview_text = self._highlight_search_terms(content[:100] + '...', search_term)
-            
-            preview_label = QLabel()
-            preview_label.setFont(QFont('Microsoft YaHei', 9))
-            preview_label.setWordWrap(True)
-            preview_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-            preview_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
-            preview_label.setCursor(Qt.CursorShape.IBeamCursor)  # 设置工字形光标
-            preview_label.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-            preview_label.customContextMenuRequested.connect(lambda pos: self.show_text_context_menu(pos, content))
-            preview_label.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
-            preview_label.setMinimumHeight(20)
-            
-            # 设置文本，使用 setText 确保正确换行
-            if search_term:
-                # 有高亮时使用 HTML
-                preview_label.setText(preview_text)
-            else:
-                # 无高亮时使用纯文本，确保正确换行
-                preview_label.setText(content if len(content) <= 100 else content[:100] + '...')
-            
-            # 添加到布局
-            main_layout.addWidget(preview_label)
-            
-            # 创建显示全部按钮
-            show_full_button = QPushButton('点击显示全部')
-            show_full_button.setFont(QFont('Microsoft YaHei', 8))
-            show_full_button.setCursor(Qt.CursorShape.PointingHandCursor)
-            show_full_button.setMinimumHeight(20)  # 设置最小高度
-            show_full_button.setMaximumHeight(25)  # 设置最大高度
-            show_full_button.setMinimumWidth(80)  # 设置最小宽度，确保按钮不会被压缩
-            show_full_button.setSizePolicy(
-                QSizePolicy.Policy.Fixed,
-                QSizePolicy.Policy.Fixed
-            )  # 设置大小策略，固定大小
-            show_full_button.setStyleSheet(f"""
-                QPushButton {{
-                    color: {highlight_color.name()};
-                    border: none;
-                    padding: 2px 0;
-                    background: transparent;
-                }}
-                QPushButton:hover {{
-                    text-decoration: underline;
-                }}
-            """)
-            show_full_button.setVisible(len(content) > 100)  # 只有长文本才显示按钮
-            
-            # 按钮点击事件 - 弹出对话框显示全部文本
-            def show_full_text():
-                self.show_full_text_dialog(content, search_term)
-            
-            show_full_button.clicked.connect(show_full_text)
-            
-            # 创建按钮的水平布局，确保左对齐
-            button_layout = QHBoxLayout()
-            button_layout.setContentsMargins(0, 0, 0, 0)
-            button_layout.addWidget(show_full_button)
-            button_layout.addStretch()  # 添加弹性空间，确保按钮左对齐
-            main_layout.addLayout(button_layout)
-        
-        # 设置主widget的最小高度，确保按钮始终可见
-        main_widget.setMinimumHeight(60)
-        
-        return main_widget
+        # 更新模型数据（只对变化的行发出通知），视图只绘制可见的行
+        self.records_model.set_records(records)
+        self._update_select_all_button_text()
     
     def _highlight_search_terms(self, text, search_term):
         """高亮搜索词
@@ -829,13 +691,6 @@ class MainWindow(QMainWindow):
         if not search_term:
             return text
         
-        # 获取系统主题颜色
-        bg_color, highlight_color, text_color = self.get_system_theme_colors()
-        
-        # 计算高亮背景色（半透明）
-        highlight_bg = QColor(highlight_color)
-        highlight_bg.setAlpha(50)  # 设置透明度为50%
-        
         # 转义HTML特殊字符
         import html
         escaped_text = html.escape(text)
@@ -846,13 +701,18 @@ class MainWindow(QMainWindow):
         pattern = re.compile(f'({re.escape(escaped_search)})', re.IGNORECASE)
         
         # 替换为高亮标签
-        highlighted_text = pattern.sub(
-            f'<span style="background-color: {highlight_bg.name()}; color: {text_color.name()}; padding: 1px 2px; border-radius: 2px;">\\1</span>',
-            escaped_text
-        )
+        highlighted_text = pattern.sub(self._get_highlight_span(), escaped_text)
         
         return highlighted_text
     
+    def _on_show_full_text_requested(self, record):
+        """点击"显示全部"时弹出全文对话框
+        
+        Args:
+            record: 记录
+        """
+        self.show_full_text_dialog(record['content'], self.search_edit.text().strip())
+    
     def show_full_text_dialog(self, content, search_term=''):
         """显示全部文本的对话框
         
@@ -952,100 +812,11 @@ class MainWindow(QMainWindow):
         
         # 设置为非模态对话框，允许操作其他窗口
         dialog.setModal(False)
+        # 关闭时释放对话框，不再持有其中的文本/图片
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         # 显示对话框
         dialog.show()
     
-    def _create_image_preview(self, image_path, record_id=None):
-        """创建图片预览
-        
-        Args:
-            image_path: 图片路径
-            record_id: 记录ID（用于检测选中状态）
-            
-        Returns:
-            图片预览widget
-        """
-        import os
-        from PyQt6.QtGui import QPixmap, QPalette
-        from PyQt6.QtCore import Qt
-        
-        # 创建一个widget来容纳图片
-        image_widget = QWidget()
-        image_layout = QVBoxLayout(image_widget)
-        image_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # 获取系统主题颜色
-        bg_color, highlight_color, text_color = self.get_system_theme_colors()
-        
-        # 检查是否选中
-        is_selected = record_id in self.selected_items if record_id else False
-        
-        # 设置widget背景色
-        try:
-            if is_selected:
-                image_widget.setStyleSheet(f"background-color: {highlight_color.name()}; border: none; border-radius: 0px;")
-            else:
-                # 移除边框，只保留背景色
-                image_widget.setStyleSheet(f"background-color: {bg_color.name()}; border: none; border-radius: 0px;")
-        except Exception as e:
-            print(f"设置图片预览样式时出错: {e}")
-            # 使用默认样式
-            image_widget.setStyleSheet("background-color: transparent; border: none; border-radius: 0px;")
-        
-        # 检查图片文件是否存在
-        if os.path.exists(image_path):
-            try:
-                # 加载图片
-                pixmap = QPixmap(image_path)
-                
-                # 缩放图片到合适的大小（最大宽度200px）
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(
-                        200, 
-                        200, 
-                        Qt.AspectRatioMode.KeepAspectRatio, 
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    
-                    # 创建图片标签
-                    image_label = QLabel()
-                    image_label.setPixmap(scaled_pixmap)
-                    image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    image_label.setMinimumSize(200, 150)
-                    image_label.setMaximumSize(200, 150)
-                    image_label.setCursor(Qt.CursorShape.PointingHandCursor)  # 设置手形光标
-                    image_label.setToolTip('点击查看大图')  # 添加提示
-                    
-                    # 添加鼠标点击事件
-                    image_label.mousePressEvent = lambda event: self.show_image_preview_dialog(image_path)
-                    
-                    # 添加到布局
-                    image_layout.addWidget(image_label)
-                else:
-                    # 图片加载失败，显示错误信息
-                    error_label = QLabel('[图片加载失败]')
-                    error_color = QColor(255, 100, 100)  # 错误色（红色系）
-                    error_label.setStyleSheet(f'color: {error_color.name()};')
-                    error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                    image_layout.addWidget(error_label)
-            except Exception as e:
-                # 图片处理出错，显示错误信息
-                error_label = QLabel(f'[图片错误: {str(e)}]')
-                error_color = QColor(255, 100, 100)  # 错误色（红色系）
-                error_label.setStyleSheet(f'color: {error_color.name()};')
-                error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                image_layout.addWidget(error_label)
-        else:
-            # 图片文件不存在，显示路径
-            path_label = QLabel(f'[图片文件不存在]\n{image_path}')
-            disabled_color = self._get_disabled_color()
-            path_label.setStyleSheet(f'color: {disabled_color.name()};')
-            path_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            path_label.setWordWrap(True)
-            image_layout.addWidget(path_label)
-        
-        return image_widget
-    
     def show_image_preview_dialog(self, image_path):
         """显示图片预览对话框
         
@@ -1165,6 +936,8 @@ class MainWindow(QMainWindow):
         
         # 设置为非模态对话框，允许操作其他窗口
         dialog.setModal(False)
+        # 关闭时释放对话框，不再持有其中的文本/图片
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         # 显示对话框
         dialog.show()
     
@@ -1176,48 +949,95 @@ class MainWindow(QMainWindow):
         """
         import win32clipboard
         import win32con
-        from PIL import Image
-        import io
+        
+        try:
+            dib_data = self._read_dib_data(image_path)
+        except OSError as e:
+            logger.error("复制图片到剪贴板时出错: %s", e)
+            return
+        if dib_data is None:
+            self._copy_image_async(image_path)
+            return
         
         try:
             win32clipboard.OpenClipboard()
+        except Exception as e:
+            logger.error("打开剪贴板时出错: %s", e)
+            return
+        try:
             win32clipboard.EmptyClipboard()
-            
-            img = Image.open(image_path)
-            output = io.BytesIO()
-            img.save(output, format='BMP')
-            dib_data = output.getvalue()[14:]
             win32clipboard.SetClipboardData(win32con.CF_DIB, dib_data)
-            
         except Exception as e:
-            print(f"复制图片到剪贴板时出错: {e}")
-        finally:
-            try:
-                win32clipboard.CloseClipboard()
-            except:
-                pass
+            logger.error("复制图片到剪贴板时出错: %s", e)
+            self._close_clipboard()
+            return
+        # 只有写入成功并关闭剪贴板后才标记为本程序写入
+        if self._close_clipboard():
+            self._mark_own_clipboard_write()
     
-    def handle_item_click(self, item):
-        """处理项目点击
+    def _read_dib_data(self, image_path):
+        """读取BMP图片文件的CF_DIB数据
+        
+        BMP文件去掉14字节的文件头即为DIB数据，无需解码。
         
         Args:
-            item: 列表项
+            image_path: 图片路径
+            
+        Returns:
+            CF_DIB格式的图片数据，不是BMP文件（如旧版本保存的PNG）时返回None
         """
-        pass
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        if data[:2] != b'BM':
+            return None
+        return data[14:]
     
-    def _on_checkbox_changed(self, record_id, state):
-        """复选框状态变化处理
+    def _copy_image_async(self, image_path):
+        """在线程池中解码图片，完成后写入剪贴板（不阻塞界面）
         
         Args:
-            record_id: 记录ID
-            state: 复选框状态
+            image_path: 图片路径
         """
-        if state == 2:  # Qt.CheckState.Checked
-            self.selected_items.add(record_id)
-        else:  # Qt.CheckState.Unchecked
-            if record_id in self.selected_items:
-                self.selected_items.remove(record_id)
+        QThreadPool.globalInstance().start(ImageLoadTask(image_path, self._image_load_signals))
+    
+    @pyqtSlot(QImage)
+    def _set_clipboard_image(self, image):
+        """将解码后的图片写入剪贴板（主线程，由Qt生成CF_DIB）
         
+        Args:
+            image: 图片
+        """
+        QApplication.clipboard().setImage(image)
+        self._mark_own_clipboard_write()
+    
+    def _close_clipboard(self):
+        """关闭剪贴板
+        
+        Returns:
+            是否成功关闭
+        """
+        import win32clipboard
+        
+        try:
+            win32clipboard.CloseClipboard()
+            return True
+        except Exception as e:
+            logger.error("关闭剪贴板时出错: %s", e)
+            return False
+    
+    def _mark_own_clipboard_write(self):
+        """通知监控器剪贴板内容由本程序写入，避免重复记录"""
+        if hasattr(self.monitor, 'mark_own_write'):
+            self.monitor.mark_own_write()
+    
+    @pyqtSlot(object, bool)
+    def _on_checkbox_changed(self, record_id, checked):
+        """复选框状态变化处理（选中集合已由模型更新）
+        
+        Args:
+            record_id: 记录ID
+            checked: 是否选中
+        """
         # 更新按钮可见性
         has_selection = len(self.selected_items) > 0
         self.copy_btn.setVisible(has_selection)
@@ -1228,7 +1048,7 @@ class MainWindow(QMainWindow):
     
     def _update_select_all_button_text(self):
         """根据当前选中状态更新全选按钮文本"""
-        total_items = self.records_list.count()
+        total_items = self.records_model.rowCount()
         if total_items == 0:
             self.select_all_btn.setText('全选')
             # 没有记录时隐藏所有操作按钮
@@ -1247,57 +1067,14 @@ class MainWindow(QMainWindow):
         self.copy_btn.setVisible(has_selection)
         self.delete_btn.setVisible(has_selection)
     
-    def show_text_context_menu(self, position, content):
-        """显示文本内容的右键菜单
-        
-        Args:
-            position: 位置
-            content: 文本内容
-        """
-        # 获取发送信号的控件
-        sender = self.sender()
-        if sender:
-            # 检查是否有选中的文本
-            selected_text = sender.selectedText()
-            if selected_text:
-                # 如果有选中的文本，使用选中的文本
-                copy_content = selected_text
-            else:
-                # 如果没有选中的文本，使用全部内容
-                copy_content = content
-            # 将局部坐标转换为全局坐标
-            global_pos = sender.mapToGlobal(position)
-        else:
-            copy_content = content
-            global_pos = position
-        
-        menu = QMenu()
-        copy_action = QAction('复制文本', self)
-        select_all_action = QAction('选择全部', self)
-        
-        copy_action.triggered.connect(lambda: self.copy_text_to_clipboard(copy_content))
-        select_all_action.triggered.connect(lambda: self.select_all_text(content))
-        
-        menu.addAction(copy_action)
-        menu.addAction(select_all_action)
-        menu.exec(global_pos)
-    
     def copy_text_to_clipboard(self, content):
         """复制文本到剪贴板
         
         Args:
             content: 文本内容
         """
-        import pyperclip
-        pyperclip.copy(content)
-    
-    def select_all_text(self, content):
-        """选择全部文本
-        
-        Args:
-            content: 文本内容
-        """
-        pass  # QLabel的文本选择由系统自动处理
+        QApplication.clipboard().setText(content)
+        self._mark_own_clipboard_write()
     
     def show_context_menu(self, position):
         """显示上下文菜单
@@ -1305,22 +1082,23 @@ class MainWindow(QMainWindow):
         Args:
             position: 位置
         """
-        item = self.records_list.itemAt(position)
-        if not item:
+        index = self.records_list.indexAt(position)
+        if not index.isValid():
             return
         
-        record = item.data(Qt.ItemDataRole.UserRole)
+        record = index.data(RecordRole)
         
-        menu = QMenu()
-        copy_action = QAction('复制到剪贴板', self)
-        delete_action = QAction('删除', self)
+        # 菜单动作随菜单一起释放，根据 exec 的返回值执行操作
+        menu = QMenu(self)
+        copy_action = menu.addAction('复制到剪贴板')
+        delete_action = menu.addAction('删除')
         
-        copy_action.triggered.connect(lambda: self.copy_record(record))
-        delete_action.triggered.connect(lambda: self.delete_record(record))
-        
-        menu.addAction(copy_action)
-        menu.addAction(delete_action)
-        menu.exec(self.records_list.mapToGlobal(position))
+        action = menu.exec(self.records_list.mapToGlobal(position))
+        menu.deleteLater()
+        if action is copy_action:
+            self.copy_record(record)
+        elif action is delete_action:
+            self.delete_record(record)
     
     def copy_record(self, record):
         """复制记录到剪贴板
@@ -1333,21 +1111,19 @@ class MainWindow(QMainWindow):
         import ctypes
         from ctypes import wintypes
         
+        if record['type'] == 'image':
+            self.copy_image_to_clipboard(record['content'])
+            return
+        
         try:
             win32clipboard.OpenClipboard()
+        except Exception as e:
+            logger.error("打开剪贴板时出错: %s", e)
+            return
+        try:
             win32clipboard.EmptyClipboard()
             
-            if record['type'] == 'image':
-                from PIL import Image
-                import io
-                
-                img = Image.open(record['content'])
-                output = io.BytesIO()
-                img.save(output, format='BMP')
-                dib_data = output.getvalue()[14:]
-                win32clipboard.SetClipboardData(win32con.CF_DIB, dib_data)
-                
-            elif record['type'] == 'file':
+            if record['type'] == 'file':
                 files = record['content'].split('\n')
                 
                 class DROPFILES(ctypes.Structure):
@@ -1377,14 +1153,12 @@ class MainWindow(QMainWindow):
                 win32clipboard.SetClipboardData(win32con.CF_UNICODETEXT, record['content'])
                 
         except Exception as e:
-            print(f"复制到剪贴板时出错: {e}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            try:
-                win32clipboard.CloseClipboard()
-            except:
-                pass
+            logger.exception("复制到剪贴板时出错: %s", e)
+            self._close_clipboard()
+            return
+        # 只有写入成功并关闭剪贴板后才标记为本程序写入
+        if self._close_clipboard():
+            self._mark_own_clipboard_write()
     
     def delete_record(self, record):
         """删除记录
@@ -1392,72 +1166,55 @@ class MainWindow(QMainWindow):
         Args:
             record: 记录
         """
-        self.storage.delete_record(record['id'])
-        self.load_records()
+        self._delete_records({record['id']})
     
+    @pyqtSlot()
     def copy_to_clipboard(self):
         """复制选中到剪贴板"""
         if not self.selected_items:
             return
         
+        records = [r for r in self.records_model.records() if r['id'] in self.selected_items]
+        
         # 如果只选中了一个记录，直接复制
-        if len(self.selected_items) == 1:
-            for i in range(self.records_list.count()):
-                item = self.records_list.item(i)
-                if not item:
-                    continue
-                
-                try:
-                    record = item.data(Qt.ItemDataRole.UserRole)
-                    if record and record['id'] in self.selected_items:
-                        self.copy_record(record)
-                        break
-                except Exception:
-                    pass
+        if len(records) == 1:
+            self.copy_record(records[0])
         else:
             # 多选复制模式：合并文本内容
-            texts = []
-            for i in range(self.records_list.count()):
-                item = self.records_list.item(i)
-                if not item:
-                    continue
-                
-                try:
-                    record = item.data(Qt.ItemDataRole.UserRole)
-                    if record and record['id'] in self.selected_items:
-                        if record['type'] == 'text':
-                            texts.append(record['content'])
-                        elif record['type'] == 'file':
-                            texts.append(record['content'])
-                except Exception:
-                    pass
+            texts = [r['content'] for r in records if r['type'] in ('text', 'file')]
             
             if texts:
                 # 合并文本，用换行符分隔
                 combined_text = '\n'.join(texts)
                 self.copy_text_to_clipboard(combined_text)
     
+    @pyqtSlot()
     def delete_selected(self):
         """删除选中"""
         if not self.selected_items:
             return
         
-        # 直接执行删除
-        self.storage.delete_multiple(self.selected_items)
-        # 清空选中集合
-        self.selected_items.clear()
-        # 重新加载记录
-        self.load_records()
-        # 更新按钮可见性
-        self.copy_btn.setVisible(False)
-        self.delete_btn.setVisible(False)
+        self._delete_records(set(self.selected_items))
+    
+    def _delete_records(self, record_ids):
+        """删除记录：存储层一次完成批量删除，列表只移除对应的行
+        
+        Args:
+            record_ids: 记录ID的集合
+        """
+        self.storage.delete_records(record_ids)
+        self.selected_items.difference_update(record_ids)
+        self.records_model.remove_records(record_ids)
+        # 更新按钮可见性和全选按钮文本
+        self._update_select_all_button_text()
     
 
     
+    @pyqtSlot()
     def toggle_select_all(self):
         """切换全选/取消全选"""
         # 检查当前是否已全部选中
-        total_items = self.records_list.count()
+        total_items = self.records_model.rowCount()
         if total_items == 0:
             return
         
@@ -1467,147 +1224,85 @@ class MainWindow(QMainWindow):
         else:
             self.select_all()
     
+    @pyqtSlot()
     def select_all(self):
         """全选"""
         self.selected_items.clear()
-        
-        for i in range(self.records_list.count()):
-            item = self.records_list.item(i)
-            if not item:
-                continue
-            
-            try:
-                record = item.data(Qt.ItemDataRole.UserRole)
-                if record:
-                    self.selected_items.add(record['id'])
-                    
-                    # 获取 widget 中的复选框并设置选中状态
-                    widget = self.records_list.itemWidget(item)
-                    if widget:
-                        # widget 是 container_widget，它的第一个子元素是主 widget
-                        main_widget = widget.findChild(QWidget)
-                        if main_widget:
-                            # 主 widget 的第一个子元素是复选框
-                            checkbox = main_widget.findChild(QCheckBox)
-                            if checkbox:
-                                checkbox.blockSignals(True)
-                                checkbox.setChecked(True)
-                                checkbox.blockSignals(False)
-            except Exception as e:
-                print(f"全选时出错: {e}")
+        self.selected_items.update(r['id'] for r in self.records_model.records())
+        self.records_model.refresh_check_states()
         
         # 更新按钮文本（通过统一的方法）
         self._update_select_all_button_text()
     
+    @pyqtSlot()
     def deselect_all(self):
         """取消全选"""
         self.selected_items.clear()
-        
-        for i in range(self.records_list.count()):
-            item = self.records_list.item(i)
-            if not item:
-                continue
-            
-            try:
-                # 获取 widget 中的复选框并设置未选中状态
-                widget = self.records_list.itemWidget(item)
-                if widget:
-                    main_widget = widget.findChild(QWidget)
-                    if main_widget:
-                        checkbox = main_widget.findChild(QCheckBox)
-                        if checkbox:
-                            checkbox.blockSignals(True)
-                            checkbox.setChecked(False)
-                            checkbox.blockSignals(False)
-            except Exception as e:
-                print(f"取消全选时出错: {e}")
+        self.records_model.refresh_check_states()
         
         # 更新按钮文本（通过统一的方法）
         self._update_select_all_button_text()
     
+    @pyqtSlot()
     def confirm_clear(self):
         """确认清空"""
         self.storage.clear_all()
         self.load_records()
     
+    @pyqtSlot()
     def on_storage_change(self):
         """更新界面（观察者方法）"""
         # 此方法用于响应存储变化的通知
-        print("收到存储变化通知，正在发送UI更新信号...")
+        logger.debug("收到存储变化通知，正在发送UI更新信号")
         # 发出信号，触发UI更新（会在主线程中执行）
         self.update_ui_signal.emit()
-        print("UI更新信号已发送")
     
+    @pyqtSlot()
     def quit_application(self):
         """完全退出应用程序"""
-        print("正在退出应用程序...")
+        logger.info("正在退出应用程序")
         self.is_closing = True
         
         # 停止剪贴板监控
         if hasattr(self.monitor, 'stop_monitoring'):
             self.monitor.stop_monitoring()
-            print("剪贴板监控已停止")
+            logger.info("剪贴板监控已停止")
         
         # 注销热键
         try:
-            import win32gui
+            import ctypes
             if hasattr(self, 'hotkey_id'):
-                win32gui.UnregisterHotKey(None, self.hotkey_id)
-                print("热键已注销")
+                # 在注册时的同一窗口句柄上注销
+                ctypes.windll.user32.UnregisterHotKey(self.hotkey_hwnd, self.hotkey_id)
+                logger.info("热键已注销")
         except Exception as e:
-            print(f"注销热键时出错: {e}")
+            logger.warning("注销热键时出错: %s", e)
         
         # 根据配置决定是否清除数据
         if self.config and self.config.get_clear_data_on_exit():
-            print("正在清理数据...")
+            logger.info("正在清理数据")
             self.storage.clear_all()
-            print("所有记录和临时文件已删除")
+            logger.info("所有记录和临时文件已删除")
         else:
-            print("保留历史记录和临时数据")
+            logger.info("保留历史记录和临时数据")
+        
+        # 等待后台的文件删除完成（最多等待2秒，避免退出时卡住）
+        if hasattr(self.storage, 'wait_for_pending_io'):
+            if not self.storage.wait_for_pending_io(timeout=2.0):
+                logger.warning("后台文件删除未在退出前完成")
+        
+        # 关闭数据库（合并WAL日志）
+        if hasattr(self.storage, 'close'):
+            self.storage.close()
         
         # 隐藏托盘图标
         if hasattr(self, 'tray_icon'):
             self.tray_icon.hide()
-            print("托盘图标已隐藏")
+            logger.info("托盘图标已隐藏")
         
         # 退出应用
         QApplication.quit()
-        print("应用程序已退出")
-    
-    def resizeEvent(self, event):
-        """窗口大小变化事件
-        
-        Args:
-            event: 事件
-        """
-        super().resizeEvent(event)
-        # 延迟更新 item 大小，确保布局已稳定
-        from PyQt6.QtCore import QTimer
-        # 取消之前的定时器，避免重复触发
-        if hasattr(self, '_resize_timer'):
-            self._resize_timer.stop()
-        self._resize_timer = QTimer(self)
-        self._resize_timer.setSingleShot(True)
-        self._resize_timer.timeout.connect(self._update_items_size)
-        self._resize_timer.start(100)
-    
-    def _update_items_size(self):
-        """更新所有 item 的大小"""
-        # 获取列表宽度
-        list_width = self.records_list.viewport().width()
-        
-        for i in range(self.records_list.count()):
-            item = self.records_list.item(i)
-            widget = self.records_list.itemWidget(item)
-            if widget:
-                # 设置 widget 宽度为列表宽度减去滚动条宽度
-                widget.setFixedWidth(list_width - 20)
-                # 更新布局
-                widget.updateGeometry()
-                # 获取建议大小
-                size_hint = widget.sizeHint()
-                # 设置 item 大小
-                item.setSizeHint(size_hint)
+        logger.info("应用程序已退出")
     
     def keyPressEvent(self, event):
         """键盘事件处理"""
@@ -1631,7 +1326,7 @@ class MainWindow(QMainWindow):
         """
         # 如果正在关闭，直接关闭
         if self.is_closing:
-            print("正在关闭窗口...")
+            logger.info("正在关闭窗口")
             a0.accept()
             return
         
@@ -1642,4 +1337,4 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
         self.hide()
-        print("窗口已最小化到托盘")
\ No newline at end of file
+        logger.info("窗口已最小化到托盘")
\ No newline at end of file
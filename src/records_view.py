@@ -0,0 +1,793 @@
+#!/usr/bin/env python3
+"""
+记录列表模块 - 剪贴板记录的列表模型与绘制代理
+
+列表只保存记录数据，每一行由代理直接绘制，不再为每条记录创建控件，
+只有可见的行才会被绘制。
+"""
+
+import os
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QStyle, QStyledItemDelegate, QStyleOptionButton, QToolTip
+from PyQt6.QtGui import (
+    QColor, QFont, QFontMetrics, QImage, QPainter, QPixmap, QTextDocument, QTextLayout, QTextOption
+)
+from PyQt6.QtCore import (
+    Qt, QAbstractListModel, QEvent, QModelIndex, QObject, QPoint, QRect, QRectF,
+    QRunnable, QSize, QThreadPool, pyqtSignal, pyqtSlot
+)
+
+
+# 记录数据角色
+RecordRole = Qt.ItemDataRole.UserRole
+
+# 记录类型标题（带图标）
+RECORD_TITLES = {
+    'text': '📝 文本',
+    'file': '📁 文件',
+    'image': '🖼️ 图片',
+}
+UNKNOWN_RECORD_TITLE = '❓ 未知'
+
+# 行内边距与间距
+ROW_MARGIN = 5
+H_SPACING = 10
+V_SPACING = 5
+
+# 类型标识宽度
+TYPE_LABEL_WIDTH = 80
+
+# 图片预览区域大小
+THUMBNAIL_WIDTH = 200
+THUMBNAIL_HEIGHT = 150
+
+# 内存中缓存的缩略图数量上限
+THUMBNAIL_CACHE_SIZE = 128
+
+# 缩略图磁盘缓存目录（位于图片所在目录下）
+THUMBNAIL_DIR = 'thumbs'
+
+# 缩略图正在后台加载的标记
+THUMBNAIL_LOADING = object()
+
+# 文本预览最大行数
+PREVIEW_MAX_LINES = 4
+
+# 文本预览排版缓存的记录数上限
+PREVIEW_CACHE_SIZE = 1024
+
+# 文本排版中的换行符
+LINE_SEPARATOR = '\u2028'
+
+# 行最小高度
+MIN_ROW_HEIGHT = 60
+
+# 显示全部按钮文本
+SHOW_FULL_TEXT = '点击显示全部'
+
+# 错误提示颜色
+ERROR_COLOR = QColor(255, 100, 100)
+
+# 图片占位文本
+MISSING_IMAGE_TEXT = '[图片文件不存在]'
+LOADING_IMAGE_TEXT = '[图片加载中...]'
+FAILED_IMAGE_TEXT = '[图片加载失败]'
+
+
+def thumbnail_path(image_path):
+    """获取图片对应的缩略图缓存路径
+    
+    Args:
+        image_path: 图片路径
+    
+    Returns:
+        缩略图路径
+    """
+    directory, filename = os.path.split(image_path)
+    return os.path.join(directory, THUMBNAIL_DIR, filename + '.png')
+
+
+class ThumbnailSignals(QObject):
+    """缩略图加载任务的信号"""
+    
+    # 加载完成信号 (缓存键, 缩略图，加载失败时为空QImage)
+    loaded = pyqtSignal(object, QImage)
+
+
+class ThumbnailTask(QRunnable):
+    """在线程池中加载并缩放缩略图的任务
+    
+    使用QImage（可在非GUI线程中使用），结果通过信号交回主线程转换为QPixmap。
+    """
+    
+    def __init__(self, key, image_path, signals):
+        """初始化
+        
+        Args:
+            key: 缓存键
+            image_path: 图片路径
+            signals: 用于通知加载结果的信号对象
+        """
+        super().__init__()
+        self.key = key
+        self.image_path = image_path
+        self.signals = signals
+    
+    def run(self):
+        """加载缩略图
+        
+        无论成功与否都会发出加载完成信号，失败时发出空QImage，
+        避免该缩略图一直处于加载中状态。
+        """
+        thumbnail = QImage()
+        try:
+            # 图片文件名由内容哈希生成，同名缩略图即对应同一张图片
+            thumb_path = thumbnail_path(self.image_path)
+            thumbnail = QImage(thumb_path)
+            if thumbnail.isNull():
+                image = QImage(self.image_path)
+                if not image.isNull():
+                    thumbnail = image.scaled(
+                        THUMBNAIL_WIDTH,
+                        THUMBNAIL_WIDTH,
+                        Qt.AspectRatioMode.KeepAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation
+                    )
+                    # 磁盘缓存写入失败（如临时目录已被清空）不影响本次显示
+                    try:
+                        os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+                        thumbnail.save(thumb_path, 'PNG')
+                    except OSError:
+                        pass
+        except Exception:
+            thumbnail = QImage()
+        finally:
+            self.signals.loaded.emit(self.key, thumbnail)
+
+
+class ClipboardRecordsModel(QAbstractListModel):
+    """剪贴板记录列表模型"""
+    
+    # 复选框状态变化信号 (记录ID, 是否选中)
+    check_state_changed = pyqtSignal(object, bool)
+    
+    def __init__(self, selected_items, parent=None):
+        """初始化
+        
+        Args:
+            selected_items: 选中记录ID的集合（与主窗口共享）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._records = []
+        self._selected_items = selected_items
+    
+    def rowCount(self, parent=QModelIndex()):
+        """获取行数"""
+        if parent.isValid():
+            return 0
+        return len(self._records)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """获取数据
+        
+        Args:
+            index: 索引
+            role: 数据角色
+        
+        Returns:
+            对应角色的数据
+        """
+        if not index.isValid():
+            return None
+        
+        record = self._records[index.row()]
+        if role == RecordRole:
+            return record
+        if role == Qt.ItemDataRole.CheckStateRole:
+            if record['id'] in self._selected_items:
+                return Qt.CheckState.Checked
+            return Qt.CheckState.Unchecked
+        return None
+    
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        """设置数据（仅支持复选框状态）
+        
+        Args:
+            index: 索引
+            value: 复选框状态
+            role: 数据角色
+        
+        Returns:
+            是否设置成功
+        """
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        
+        record_id = self._records[index.row()]['id']
+        checked = value == Qt.CheckState.Checked
+        if checked:
+            self._selected_items.add(record_id)
+        else:
+            self._selected_items.discard(record_id)
+        
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+        self.check_state_changed.emit(record_id, checked)
+        return True
+    
+    def flags(self, index):
+        """获取项标志"""
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsUserCheckable
+    
+    def records(self):
+        """获取当前显示的记录列表
+        
+        Returns:
+            记录列表
+        """
+        return self._records
+    
+    def set_records(self, records):
+        """更新记录列表
+        
+        只在顶部插入了新记录时发出插入通知，记录未变化时只通知重绘，
+        其他情况（筛选、搜索、删除）才重置整个模型。
+        
+        Args:
+            records: 新的记录列表
+        """
+        records = list(records)
+        old_ids = [r['id'] for r in self._records]
+        new_ids = [r['id'] for r in records]
+        added = len(new_ids) - len(old_ids)
+        
+        if new_ids == old_ids:
+            self._records = records
+            if records:
+                self.dataChanged.emit(self.index(0), self.index(len(records) - 1))
+        elif old_ids and added > 0 and new_ids[added:] == old_ids:
+            # 新记录插入在顶部
+            self.beginInsertRows(QModelIndex(), 0, added - 1)
+            self._records = records
+            self.endInsertRows()
+        else:
+            self.beginResetModel()
+            self._records = records
+            self.endResetModel()
+    
+    def remove_records(self, record_ids):
+        """移除指定记录的行（不重置模型）
+        
+        连续的行合并为一次移除通知，从下往上移除以保持行号有效。
+        
+        Args:
+            record_ids: 记录ID的集合
+        """
+        rows = [row for row, record in enumerate(self._records) if record['id'] in record_ids]
+        while rows:
+            last = rows.pop()
+            first = last
+            while rows and rows[-1] == first - 1:
+                first = rows.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._records[first:last + 1]
+            self.endRemoveRows()
+    
+    def refresh_check_states(self):
+        """选中集合被批量修改后，通知视图重绘所有复选框"""
+        if not self._records:
+            return
+        self.dataChanged.emit(
+            self.index(0),
+            self.index(len(self._records) - 1),
+            [Qt.ItemDataRole.CheckStateRole]
+        )
+
+
+class ClipboardRecordDelegate(QStyledItemDelegate):
+    """剪贴板记录绘制代理"""
+    
+    # 点击"显示全部"信号 (记录)
+    show_full_text_requested = pyqtSignal(object)
+    # 点击图片预览信号 (图片路径)
+    image_preview_requested = pyqtSignal(str)
+    # 缩略图后台加载完成信号
+    thumbnail_loaded = pyqtSignal()
+    
+    def __init__(self, highlight_func, parent=None):
+        """初始化
+        
+        Args:
+            highlight_func: 为文本添加搜索高亮的函数，返回HTML
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._highlight_func = highlight_func
+        
+        # 当前搜索词（用于高亮）
+        self.search_term = ''
+        
+        # 主题颜色
+        self.text_color = QColor(Qt.GlobalColor.black)
+        self.disabled_color = QColor(153, 153, 153)
+        self.border_color = QColor(204, 204, 204)
+        self.highlight_color = QColor(0, 120, 215)
+        
+        # 字体
+        self.title_font = QFont('Microsoft YaHei', 9, QFont.Weight.Bold)
+        self.preview_font = QFont('Microsoft YaHei', 9)
+        self.filename_font = QFont('Microsoft YaHei', 9, QFont.Weight.Bold)
+        self.path_font = QFont('Microsoft YaHei', 8)
+        self.link_font = QFont('Microsoft YaHei', 8)
+        self.timestamp_font = QFont('Microsoft YaHei', 8)
+        
+        # 字体度量只计算一次，行布局时直接使用
+        self._preview_metrics = QFontMetrics(self.preview_font)
+        self._path_metrics = QFontMetrics(self.path_font)
+        self._preview_line_height = self._preview_metrics.lineSpacing()
+        self._filename_height = QFontMetrics(self.filename_font).lineSpacing()
+        self._path_height = self._path_metrics.lineSpacing()
+        link_metrics = QFontMetrics(self.link_font)
+        self._link_size = QSize(
+            link_metrics.horizontalAdvance(SHOW_FULL_TEXT) + 4,
+            link_metrics.lineSpacing() + 4
+        )
+        self._timestamp_height = QFontMetrics(self.timestamp_font).lineSpacing()
+        
+        # 文本预览排版LRU缓存 {记录ID: (预览行列表, 是否被截断)}，只对应一种宽度，
+        # 宽度变化或记录被移除时清空
+        self._preview_lines_cache = OrderedDict()
+        self._preview_lines_width = None
+        self._preview_option = QTextOption()
+        self._preview_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        
+        # 搜索高亮用的文档对象（复用，避免每次绘制都创建）
+        self._document = QTextDocument()
+        self._document.setDefaultFont(self.preview_font)
+        self._document.setDocumentMargin(0)
+        self._document.setDefaultStyleSheet(f'body {{ color: {self.text_color.name()}; }}')
+        
+        # 缩略图LRU缓存 {(图片路径, 修改时间): QPixmap或None}
+        self._thumbnails = OrderedDict()
+        # 正在后台加载的缩略图
+        self._pending_thumbnails = set()
+        self._thumbnail_signals = ThumbnailSignals(self)
+        self._thumbnail_signals.loaded.connect(self._on_thumbnail_loaded)
+        
+        # 图片占位图缓存 {(文本, 设备像素比): QPixmap}，主题颜色变化时清空
+        self._placeholders = {}
+        
+        # 图片修改时间缓存 {图片路径: 修改时间，文件不存在时为None}，
+        # 绘制时无需每次访问文件系统，记录变化时清空
+        self._image_mtimes = {}
+    
+    def set_colors(self, text_color, disabled_color, border_color, highlight_color):
+        """设置主题颜色
+        
+        Args:
+            text_color: 文本色
+            disabled_color: 次要文本色
+            border_color: 分割线颜色
+            highlight_color: 高亮色
+        """
+        self.text_color = text_color
+        self.disabled_color = disabled_color
+        self.border_color = border_color
+        self.highlight_color = highlight_color
+        self._document.setDefaultStyleSheet(f'body {{ color: {text_color.name()}; }}')
+        self._placeholders.clear()
+    
+    def _get_placeholder(self, text, color, device_pixel_ratio):
+        """获取图片区域的占位图（同一文本只绘制一次，所有记录共用）
+        
+        Args:
+            text: 占位文本
+            color: 文本颜色
+            device_pixel_ratio: 设备像素比
+        
+        Returns:
+            占位图QPixmap
+        """
+        key = (text, device_pixel_ratio)
+        placeholder = self._placeholders.get(key)
+        if placeholder is None:
+            placeholder = QPixmap(
+                round(THUMBNAIL_WIDTH * device_pixel_ratio),
+                round(THUMBNAIL_HEIGHT * device_pixel_ratio)
+            )
+            placeholder.setDevicePixelRatio(device_pixel_ratio)
+            placeholder.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(placeholder)
+            painter.setFont(self.path_font)
+            painter.setPen(color)
+            painter.drawText(QRect(0, 0, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Qt.AlignmentFlag.AlignCenter, text)
+            painter.end()
+            self._placeholders[key] = placeholder
+        return placeholder
+    
+    def _image_mtime(self, image_path):
+        """获取图片的修改时间（缓存，每个路径只访问一次文件系统）
+        
+        Args:
+            image_path: 图片路径
+        
+        Returns:
+            修改时间，文件不存在时返回None
+        """
+        try:
+            return self._image_mtimes[image_path]
+        except KeyError:
+            pass
+        try:
+            mtime = os.path.getmtime(image_path)
+        except OSError:
+            mtime = None
+        self._image_mtimes[image_path] = mtime
+        return mtime
+    
+    @pyqtSlot()
+    def invalidate_image_info(self):
+        """清空图片修改时间缓存（记录列表变化时调用）"""
+        self._image_mtimes.clear()
+    
+    @pyqtSlot()
+    def clear_preview_cache(self):
+        """清空文本预览排版缓存（记录被移除或列表重置时调用）"""
+        self._preview_lines_cache.clear()
+    
+    def _get_thumbnail(self, image_path, mtime):
+        """获取缩放后的图片
+        
+        内存缓存未命中时，在线程池中读取磁盘缓存或解码原图并缩放，
+        加载期间返回THUMBNAIL_LOADING，完成后发出thumbnail_loaded信号。
+        
+        Args:
+            image_path: 图片路径
+            mtime: 图片修改时间
+        
+        Returns:
+            缩放后的QPixmap，加载失败时返回None，加载中返回THUMBNAIL_LOADING
+        """
+        key = (image_path, mtime)
+        if key in self._thumbnails:
+            self._thumbnails.move_to_end(key)
+            return self._thumbnails[key]
+        
+        if key not in self._pending_thumbnails:
+            self._pending_thumbnails.add(key)
+            QThreadPool.globalInstance().start(ThumbnailTask(key, image_path, self._thumbnail_signals))
+        return THUMBNAIL_LOADING
+    
+    def _on_thumbnail_loaded(self, key, image):
+        """缩略图加载完成（主线程）
+        
+        Args:
+            key: 缓存键
+            image: 缩略图，加载失败时为空QImage
+        """
+        self._pending_thumbnails.discard(key)
+        self._thumbnails[key] = None if image.isNull() else QPixmap.fromImage(image)
+        if len(self._thumbnails) > THUMBNAIL_CACHE_SIZE:
+            self._thumbnails.popitem(last=False)
+        self.thumbnail_loaded.emit()
+    
+    def _preview_lines(self, record, width):
+        """按可用宽度排版文本预览
+        
+        最多排版 PREVIEW_MAX_LINES 行，超出部分在最后一行末尾省略。
+        每行至少占1像素宽，因此只需排版内容的前 PREVIEW_MAX_LINES * width 个字符。
+        结果按记录ID缓存，宽度变化时才重新计算，绘制和点击时不再重复排版文字。
+        
+        Args:
+            record: 记录
+            width: 可用宽度
+        
+        Returns:
+            (预览行列表, 是否被截断) 元组
+        """
+        if width != self._preview_lines_width:
+            self._preview_lines_cache.clear()
+            self._preview_lines_width = width
+        
+        cached = self._preview_lines_cache.get(record['id'])
+        if cached is not None:
+            self._preview_lines_cache.move_to_end(record['id'])
+            return cached
+        
+        width = max(width, 1)
+        content = record['content']
+        text = content[:PREVIEW_MAX_LINES * width].replace('\r\n', '\n').replace('\n', LINE_SEPARATOR)
+        
+        layout = QTextLayout(text, self.preview_font)
+        layout.setTextOption(self._preview_option)
+        layout.beginLayout()
+        lines = []
+        starts = []
+        while len(lines) < PREVIEW_MAX_LINES:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            starts.append(line.textStart())
+            lines.append(text[line.textStart():line.textStart() + line.textLength()].rstrip(LINE_SEPARATOR))
+        layout.endLayout()
+        
+        truncated = False
+        if lines:
+            last_start = starts[-1]
+            last_end = last_start + layout.lineAt(len(lines) - 1).textLength()
+            truncated = last_end < len(text) or len(text) < len(content)
+        if truncated:
+            # 最后一行改为从行首到换行处的文本，放不下的部分用省略号代替
+            last = text[last_start:].split(LINE_SEPARATOR, 1)[0]
+            elided = self._preview_metrics.elidedText(last, Qt.TextElideMode.ElideRight, width)
+            if elided == last:
+                elided = self._preview_metrics.elidedText(last + '…', Qt.TextElideMode.ElideRight, width)
+            lines[-1] = elided
+        
+        result = (lines or [''], truncated)
+        self._preview_lines_cache[record['id']] = result
+        if len(self._preview_lines_cache) > PREVIEW_CACHE_SIZE:
+            self._preview_lines_cache.popitem(last=False)
+        return result
+    
+    def _layout(self, option, record):
+        """计算一行中各元素的位置
+        
+        Args:
+            option: 绘制选项（使用其中的rect）
+            record: 记录
+        
+        Returns:
+            各元素区域的字典
+        """
+        rect = option.rect
+        style = option.widget.style() if option.widget else None
+        indicator_width = style.pixelMetric(QStyle.PixelMetric.PM_IndicatorWidth) if style else 13
+        indicator_height = style.pixelMetric(QStyle.PixelMetric.PM_IndicatorHeight) if style else 13
+        
+        rects = {}
+        x = rect.left() + ROW_MARGIN
+        content_top = rect.top() + ROW_MARGIN
+        
+        # 内容区域
+        content_left = x + indicator_width + H_SPACING + TYPE_LABEL_WIDTH + H_SPACING
+        content_width = rect.right() - ROW_MARGIN - content_left
+        y = content_top
+        
+        record_type = record['type']
+        if record_type == 'image':
+            rects['image'] = QRect(content_left, y, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
+            y += THUMBNAIL_HEIGHT + V_SPACING
+        elif record_type == 'file':
+            rects['filename'] = QRect(content_left, y, content_width, self._filename_height)
+            y += self._filename_height + V_SPACING
+            rects['path'] = QRect(content_left, y, content_width, self._path_height)
+            y += self._path_height + V_SPACING
+        else:
+            lines, truncated = self._preview_lines(record, content_width)
+            preview_height = len(lines) * self._preview_line_height
+            rects['preview'] = QRect(content_left, y, content_width, preview_height)
+            y += preview_height + V_SPACING
+            if truncated:
+                rects['link'] = QRect(QPoint(content_left, y), self._link_size)
+                y += self._link_size.height() + V_SPACING
+        
+        rects['timestamp'] = QRect(content_left, y, content_width, self._timestamp_height)
+        y += self._timestamp_height + ROW_MARGIN
+        
+        # 行高（至少为最小高度，底部留1像素分割线）
+        row_height = max(y - rect.top(), MIN_ROW_HEIGHT) + 1
+        rects['height'] = row_height
+        
+        # 复选框和类型标识垂直居中
+        center_y = rect.top() + (row_height - 1) // 2
+        rects['checkbox'] = QRect(x, center_y - indicator_height // 2, indicator_width, indicator_height)
+        x += indicator_width + H_SPACING
+        rects['type'] = QRect(x, rect.top(), TYPE_LABEL_WIDTH, row_height - 1)
+        
+        return rects
+    
+    def sizeHint(self, option, index):
+        """获取行大小"""
+        record = index.data(RecordRole)
+        if record is None:
+            return super().sizeHint(option, index)
+        
+        # 根据视图宽度计算文字换行后的高度
+        if option.widget is not None:
+            option.rect = QRect(0, 0, option.widget.viewport().width(), 0)
+        rects = self._layout(option, record)
+        # 宽度只需给出最小值，列表模式下每行会被拉伸到视口宽度
+        return QSize(1, rects['height'])
+    
+    def paint(self, painter, option, index):
+        """绘制一行记录"""
+        record = index.data(RecordRole)
+        if record is None:
+            return
+        
+        rects = self._layout(option, record)
+        rect = option.rect
+        widget = option.widget
+        style = widget.style() if widget else None
+        
+        painter.save()
+        
+        # 复选框
+        checkbox_option = QStyleOptionButton()
+        checkbox_option.rect = rects['checkbox']
+        checkbox_option.state = QStyle.StateFlag.State_Enabled
+        if index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked:
+            checkbox_option.state |= QStyle.StateFlag.State_On
+        else:
+            checkbox_option.state |= QStyle.StateFlag.State_Off
+        if style:
+            style.drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorCheckBox, checkbox_option, painter, widget)
+        
+        # 类型标识
+        painter.setFont(self.title_font)
+        painter.setPen(self.text_color)
+        painter.drawText(
+            rects['type'],
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            RECORD_TITLES.get(record['type'], UNKNOWN_RECORD_TITLE)
+        )
+        
+        # 内容预览
+        record_type = record['type']
+        if record_type == 'image':
+            self._paint_image(painter, rects['image'], record['content'])
+        elif record_type == 'file':
+            content = record['content']
+            painter.setFont(self.filename_font)
+            painter.setPen(self.text_color)
+            painter.drawText(rects['filename'], Qt.AlignmentFlag.AlignLeft, os.path.basename(content))
+            painter.setFont(self.path_font)
+            painter.setPen(self.disabled_color)
+            path_rect = rects['path']
+            painter.drawText(
+                path_rect,
+                Qt.AlignmentFlag.AlignLeft,
+                self._path_metrics.elidedText(content, Qt.TextElideMode.ElideMiddle, path_rect.width())
+            )
+        else:
+            self._paint_text_preview(painter, rects['preview'], record)
+            if 'link' in rects:
+                painter.setFont(self.link_font)
+                painter.setPen(self.highlight_color)
+                painter.drawText(rects['link'], Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, SHOW_FULL_TEXT)
+        
+        # 时间戳
+        painter.setFont(self.timestamp_font)
+        painter.setPen(self.disabled_color)
+        painter.drawText(rects['timestamp'], Qt.AlignmentFlag.AlignLeft, record['timestamp'])
+        
+        # 分割线（直接填充1像素高的矩形，无需设置画笔）
+        painter.fillRect(rect.left(), rect.bottom(), rect.width(), 1, self.border_color)
+        
+        painter.restore()
+    
+    def _paint_text_preview(self, painter, preview_rect, record):
+        """绘制文本预览
+        
+        Args:
+            painter: 画笔
+            preview_rect: 预览区域
+            record: 记录
+        """
+        lines, truncated = self._preview_lines(record, preview_rect.width())
+        
+        if self.search_term:
+            # 有搜索词时使用带高亮的HTML（逐行高亮后用<br>连接）
+            html_lines = [self._highlight_func(line, self.search_term) for line in lines]
+            document = self._document
+            document.setTextWidth(preview_rect.width())
+            document.setHtml(f'<body style="white-space: pre;">{"<br>".join(html_lines)}</body>')
+            painter.save()
+            painter.translate(preview_rect.topLeft())
+            document.drawContents(painter, QRectF(0, 0, preview_rect.width(), preview_rect.height()))
+            painter.restore()
+        else:
+            painter.setFont(self.preview_font)
+            painter.setPen(self.text_color)
+            line_rect = QRect(preview_rect.left(), preview_rect.top(), preview_rect.width(), self._preview_line_height)
+            for line in lines:
+                painter.drawText(line_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, line)
+                line_rect.translate(0, self._preview_line_height)
+    
+    def _paint_image(self, painter, image_rect, image_path):
+        """绘制图片预览
+        
+        Args:
+            painter: 画笔
+            image_rect: 图片区域
+            image_path: 图片路径
+        """
+        device_pixel_ratio = painter.device().devicePixelRatioF()
+        mtime = self._image_mtime(image_path)
+        if mtime is None:
+            # 图片文件不存在，显示占位图（路径在提示中显示）
+            painter.drawPixmap(
+                image_rect.topLeft(),
+                self._get_placeholder(MISSING_IMAGE_TEXT, self.disabled_color, device_pixel_ratio)
+            )
+            return
+        
+        thumbnail = self._get_thumbnail(image_path, mtime)
+        if thumbnail is THUMBNAIL_LOADING:
+            # 缩略图加载中，显示占位图
+            painter.drawPixmap(
+                image_rect.topLeft(),
+                self._get_placeholder(LOADING_IMAGE_TEXT, self.disabled_color, device_pixel_ratio)
+            )
+            return
+        if thumbnail is None:
+            # 图片加载失败，显示错误信息
+            painter.drawPixmap(
+                image_rect.topLeft(),
+                self._get_placeholder(FAILED_IMAGE_TEXT, ERROR_COLOR, device_pixel_ratio)
+            )
+            return
+        
+        # 在预览区域内居中绘制
+        x = image_rect.left() + (image_rect.width() - thumbnail.width()) // 2
+        y = image_rect.top() + (image_rect.height() - thumbnail.height()) // 2
+        painter.save()
+        painter.setClipRect(image_rect)
+        painter.drawPixmap(x, y, thumbnail)
+        painter.restore()
+    
+    def helpEvent(self, event, view, option, index):
+        """显示图片区域的提示（图片路径或查看大图）"""
+        record = index.data(RecordRole)
+        if event.type() == QEvent.Type.ToolTip and record is not None and record['type'] == 'image':
+            rects = self._layout(option, record)
+            if rects['image'].contains(event.pos()):
+                image_path = record['content']
+                if self._image_mtime(image_path) is not None:
+                    tooltip = '点击查看大图'
+                else:
+                    tooltip = f'{MISSING_IMAGE_TEXT}\n{image_path}'
+                QToolTip.showText(event.globalPos(), tooltip, view)
+                return True
+        return super().helpEvent(event, view, option, index)
+    
+    def editorEvent(self, event, model, option, index):
+        """处理行内鼠标点击（复选框、显示全部、图片预览）"""
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+        
+        record = index.data(RecordRole)
+        if record is None:
+            return False
+        
+        rects = self._layout(option, record)
+        pos = event.position().toPoint()
+        
+        if rects['checkbox'].contains(pos):
+            if event.type() == QEvent.Type.MouseButtonRelease:
+                checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+                model.setData(
+                    index,
+                    Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked,
+                    Qt.ItemDataRole.CheckStateRole
+                )
+            return True
+        
+        if 'link' in rects and rects['link'].contains(pos):
+            if event.type() == QEvent.Type.MouseButtonRelease:
+                self.show_full_text_requested.emit(record)
+            return True
+        
+        if 'image' in rects and rects['image'].contains(pos) and self._image_mtime(record['content']) is not None:
+            if event.type() == QEvent.Type.MouseButtonRelease:
+                self.image_preview_requested.emit(record['content'])
+            return True
+        
+        return False
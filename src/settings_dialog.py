@@ -7,7 +7,7 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, 
     QPushButton, QGroupBox, QButtonGroup, QRadioButton, QCheckBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSlot
 from PyQt6.QtGui import QFont
 
 
@@ -41,6 +41,8 @@ class SettingsDialog(QDialog):
         records_layout = QVBoxLayout(records_group)
         
         self.records_button_group = QButtonGroup(self)
+        # {条数: 单选按钮}，加载设置时直接查找
+        self._records_by_value = {}
         
         records_options = [
             (10, '10条'),
@@ -54,6 +56,7 @@ class SettingsDialog(QDialog):
             radio = QRadioButton(label)
             self.records_button_group.addButton(radio)
             radio.setProperty('value', value)
+            self._records_by_value[value] = radio
             records_layout.addWidget(radio)
         
         main_layout.addWidget(records_group)
@@ -63,6 +66,8 @@ class SettingsDialog(QDialog):
         time_layout = QVBoxLayout(time_group)
         
         self.time_button_group = QButtonGroup(self)
+        # {分钟数: 单选按钮}，加载设置时直接查找
+        self._time_by_value = {}
         
         time_options = [
             (5, '5分钟'),
@@ -78,6 +83,7 @@ class SettingsDialog(QDialog):
             radio = QRadioButton(label)
             self.time_button_group.addButton(radio)
             radio.setProperty('value', value)
+            self._time_by_value[value] = radio
             time_layout.addWidget(radio)
         
         main_layout.addWidget(time_group)
@@ -109,24 +115,19 @@ class SettingsDialog(QDialog):
     def load_current_settings(self):
         """加载当前设置"""
         # 加载最大记录条数
-        max_records = self.config.get_max_records()
-        for button in self.records_button_group.buttons():
-            value = button.property('value')
-            if value == max_records:
-                button.setChecked(True)
-                break
+        button = self._records_by_value.get(self.config.get_max_records())
+        if button is not None:
+            button.setChecked(True)
         
         # 加载存留时间
-        max_age_minutes = self.config.get_max_age_minutes()
-        for button in self.time_button_group.buttons():
-            value = button.property('value')
-            if value == max_age_minutes:
-                button.setChecked(True)
-                break
+        button = self._time_by_value.get(self.config.get_max_age_minutes())
+        if button is not None:
+            button.setChecked(True)
         
         # 加载退出时清除数据设置
         self.clear_data_checkbox.setChecked(self.config.get_clear_data_on_exit())
     
+    @pyqtSlot()
     def accept_settings(self):
         """接受设置"""
         # 获取选中的最大记录条数
@@ -144,4 +145,7 @@ class SettingsDialog(QDialog):
         # 保存退出时清除数据设置
         self.config.set_clear_data_on_exit(self.clear_data_checkbox.isChecked())
         
+        # 所有设置一次性写入文件
+        self.config.flush()
+        
         self.accept()
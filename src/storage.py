@@ -3,9 +3,207 @@
 存储模块 - 负责剪贴板历史的持久化存储
 """
 
+import concurrent.futures
+import hashlib
 import json
+import logging
 import os
+import shutil
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
 from datetime import datetime
+from operator import itemgetter
+
+# 优先使用 orjson 解析旧版本的JSON数据，未安装时退回标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+# 记录时间戳的显示格式
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 记录表结构（id为记录创建时的时间戳，同类型同内容的记录只保留一条）
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS records (
+        id REAL PRIMARY KEY,
+        type TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        favorited INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (type, content)
+    )
+"""
+
+# 以下语句文本固定，sqlite3会缓存编译结果，重复执行时无需重新解析
+_SELECT_SQL = 'SELECT id, type, content, timestamp, favorited FROM records ORDER BY id DESC LIMIT ?'
+
+# 重复内容只更新时间戳，使其排到最前
+_UPSERT_SQL = """
+    INSERT INTO records (id, type, content, timestamp, favorited) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (type, content) DO UPDATE SET id = excluded.id, timestamp = excluded.timestamp
+"""
+
+_INSERT_IGNORE_SQL = 'INSERT OR IGNORE INTO records (id, type, content, timestamp, favorited) VALUES (?, ?, ?, ?, ?)'
+
+_DELETE_SQL = 'DELETE FROM records WHERE id = ?'
+
+_DELETE_BEFORE_SQL = 'DELETE FROM records WHERE id < ?'
+
+# 批量删除时每条语句绑定的参数个数上限（低于SQLite的变量数限制）
+_DELETE_BATCH_SIZE = 500
+
+
+# 合并观察者通知的延迟（秒），短时间内的多次变更只通知一次
+NOTIFY_DELAY = 0.05
+
+
+# 超过该长度的内容在去重索引中以摘要作为键，避免索引重复持有长文本
+_INDEX_DIGEST_THRESHOLD = 256
+
+
+def _index_key(record):
+    """获取记录在去重索引中的键
+    
+    Args:
+        record: 记录字典
+        
+    Returns:
+        (类型, 内容或内容摘要) 元组
+    """
+    content = record['content']
+    if len(content) > _INDEX_DIGEST_THRESHOLD:
+        content = hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    return (record['type'], content)
+
+
+def _group_by_type(records):
+    """按类型分组记录（保持原有顺序）
+    
+    Args:
+        records: 记录列表
+        
+    Returns:
+        {类型: 记录列表} 字典
+    """
+    by_type = {}
+    for record in records:
+        by_type.setdefault(record['type'], []).append(record)
+    return by_type
+
+
+def _negated_id(record):
+    """获取记录id的相反数（按id倒序排列的列表以此为升序键）"""
+    return -record['id']
+
+
+def _count_before_cutoff(records, cutoff):
+    """计算按id倒序排列的记录中未过期（id不小于截止时间）的记录数
+    
+    以id的相反数为键二分查找边界，无需遍历记录。
+    
+    Args:
+        records: 按id倒序排列的记录列表
+        cutoff: 截止时间戳
+        
+    Returns:
+        未过期的记录数
+    """
+    return bisect_right(records, -cutoff, key=_negated_id)
+
+
+def _loads(data):
+    """解析JSON字节串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _record_params(record):
+    """将记录字典转换为SQL参数
+    
+    Args:
+        record: 记录字典
+        
+    Returns:
+        参数元组
+    """
+    return (record['id'], record['type'], record['content'], record['timestamp'],
+            int(bool(record.get('favorited', False))))
+
+
+def normalize_timestamp(timestamp_str):
+    """将旧格式（ISO格式，如2026-02-17T23:16:56.337378）的时间戳转换为显示格式
+    
+    Args:
+        timestamp_str: 时间戳字符串
+        
+    Returns:
+        显示格式的时间戳（如2026-02-17 23:16:56）
+    """
+    if 'T' not in timestamp_str:
+        return timestamp_str
+    try:
+        return datetime.fromisoformat(timestamp_str).strftime(TIMESTAMP_FORMAT)
+    except ValueError:
+        return timestamp_str
+
+
+# Windows API绑定：模块导入时定义一次，删除文件时不再重新定义结构体和设置参数类型
+if os.name == 'nt':
+    import ctypes
+    from ctypes import wintypes
+    
+    # 定义Windows API常量
+    FO_DELETE = 0x0003
+    FOF_NOCONFIRMATION = 0x0010
+    FOF_NOERRORUI = 0x0400
+    FOF_SILENT = 0x0004
+    
+    # 定义SHFILEOPSTRUCT结构
+    class SHFILEOPSTRUCT(ctypes.Structure):
+        _fields_ = [
+            ('hwnd', wintypes.HWND),
+            ('wFunc', wintypes.UINT),
+            ('pFrom', wintypes.LPCWSTR),
+            ('pTo', wintypes.LPCWSTR),
+            ('fFlags', wintypes.UINT),  # 使用UINT代替FILEOP_FLAGS
+            ('fAnyOperationsAborted', wintypes.BOOL),
+            ('hNameMappings', wintypes.HANDLE),
+            ('lpszProgressTitle', wintypes.LPCWSTR)
+        ]
+    
+    # 从shell32.dll获取函数
+    _SHFileOperation = ctypes.windll.shell32.SHFileOperationW
+    _SHFileOperation.argtypes = [ctypes.POINTER(SHFILEOPSTRUCT)]
+    _SHFileOperation.restype = ctypes.c_int
+    
+    def _shell_delete(file_paths):
+        """通过一次 SHFileOperationW 调用删除文件
+        
+        Args:
+            file_paths: 文件路径列表
+            
+        Returns:
+            SHFileOperationW 的返回值（成功时为0）
+        """
+        # 准备文件路径（多个路径以空字符分隔，整体以两个空字符结尾）
+        from_path = '\0'.join(file_paths) + '\0\0'
+        to_path = '\0\0'
+        
+        # 创建结构体（未设置的字段默认为0/NULL）
+        file_op = SHFILEOPSTRUCT(
+            wFunc=FO_DELETE,
+            pFrom=from_path,
+            pTo=to_path,
+            fFlags=FOF_NOCONFIRMATION | FOF_NOERRORUI | FOF_SILENT
+        )
+        return _SHFileOperation(ctypes.byref(file_op))
 
 
 def delete_file_permanently(file_path):
@@ -13,72 +211,79 @@ def delete_file_permanently(file_path):
     
     Args:
         file_path: 文件路径
+        
+    Returns:
+        是否删除成功
     """
+    return delete_files_permanently([file_path])
+
+
+def delete_files_permanently(file_paths):
+    """批量彻底删除文件（不进入回收站）
+    
+    Windows上所有路径合并到一次 SHFileOperationW 调用中，只执行一次外壳操作。
+    调用前不检查文件是否存在；批量删除失败时（如其中有文件已不存在），
+    才筛选出仍存在的文件重试一次。
+    
+    Args:
+        file_paths: 文件路径列表
+        
+    Returns:
+        是否全部删除成功
+    """
+    if not file_paths:
+        return True
     try:
         # Windows系统：使用Windows API彻底删除文件
         if os.name == 'nt':
-            import ctypes
-            from ctypes import wintypes
-            
-            # 定义Windows API常量
-            FO_DELETE = 0x0003
-            FOF_NOCONFIRMATION = 0x0010
-            FOF_NOERRORUI = 0x0400
-            FOF_SILENT = 0x0004
-            
-            # 定义SHFILEOPSTRUCT结构
-            class SHFILEOPSTRUCT(ctypes.Structure):
-                _fields_ = [
-                    ('hwnd', wintypes.HWND),
-                    ('wFunc', wintypes.UINT),
-                    ('pFrom', wintypes.LPCWSTR),
-                    ('pTo', wintypes.LPCWSTR),
-                    ('fFlags', wintypes.UINT),  # 使用UINT代替FILEOP_FLAGS
-                    ('fAnyOperationsAborted', wintypes.BOOL),
-                    ('hNameMappings', wintypes.HANDLE),
-                    ('lpszProgressTitle', wintypes.LPCWSTR)
-                ]
-            
-            # 加载shell32.dll
-            shell32 = ctypes.windll.shell32
-            SHFileOperation = shell32.SHFileOperationW
-            SHFileOperation.argtypes = [
-                ctypes.POINTER(SHFILEOPSTRUCT),
-            ]
-            SHFileOperation.restype = wintypes.BOOL
-            
-            # 准备文件路径（需要双空格结尾）
-            from_path = file_path + '\0\0'
-            to_path = '\0\0'
-            
-            # 创建结构体
-            file_op = SHFILEOPSTRUCT()
-            file_op.wFunc = FO_DELETE
-            file_op.pFrom = from_path
-            file_op.pTo = to_path
-            file_op.fFlags = FOF_NOCONFIRMATION | FOF_NOERRORUI | FOF_SILENT
-            file_op.hwnd = None
-            file_op.hNameMappings = None
-            file_op.lpszProgressTitle = None
-            
-            # 调用Windows API删除文件
-            result = SHFileOperation(ctypes.byref(file_op))
-            if result:
-                print(f"已彻底删除文件: {file_path}")
+            result = _shell_delete(file_paths)
+            if result != 0:
+                # 外壳删除遇到不存在的文件会报错，只对仍存在的文件重试
+                file_paths = [file_path for file_path in file_paths if os.path.exists(file_path)]
+                result = _shell_delete(file_paths) if file_paths else 0
+            if result == 0:
+                logger.debug("已彻底删除 %d 个文件", len(file_paths))
                 return True
             else:
-                print(f"删除文件失败: {file_path}")
+                logger.error("删除文件失败（错误码 %s）: %s", result, file_paths)
                 return False
         else:
-            # 非Windows系统：直接删除
-            os.unlink(file_path)
-            print(f"已删除文件: {file_path}")
-            return True
+            # 非Windows系统：逐个直接删除，单个失败不影响其余文件
+            success = True
+            for file_path in file_paths:
+                try:
+                    os.unlink(file_path)
+                    logger.debug("已删除文件: %s", file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error("删除文件 %s 时出错: %s", file_path, e)
+                    success = False
+            return success
     except Exception as e:
-        print(f"删除文件时出错: {e}")
+        logger.error("删除文件时出错: %s", e)
         return False
 
 
+def _delete_files_and_dir(file_paths, temp_dir):
+    """彻底删除图片文件后删除目录（在后台线程中执行）
+    
+    Args:
+        file_paths: 图片路径列表
+        temp_dir: 要删除的目录（已从临时图片目录改名，监控器不会再写入），None表示不删除目录
+    """
+    delete_files_permanently(file_paths)
+    if temp_dir is None:
+        return
+    try:
+        shutil.rmtree(temp_dir)
+        logger.debug("已删除临时目录: %s", temp_dir)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error("删除临时目录时出错: %s", e)
+
+
 class Storage:
     """存储类"""
     
@@ -92,29 +297,156 @@ class Storage:
         self.config = config
         self.max_records = max_records if config is None else config.get_max_records()
         # 存储到程序目录
-        self.data_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'clipboard_data.json')
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.db_file = os.path.join(base_dir, 'clipboard_data.db')
+        # 旧版本的JSON数据文件，首次运行时导入数据库
+        self.data_file = os.path.join(base_dir, 'clipboard_data.json')
         self.records = []
         self.observers = []
+        # 搜索用的大小写折叠缓存 {内容: 折叠后的内容}
+        self._folded_contents = {}
+        # 去重索引 {(类型, 内容): 记录}，添加记录时无需遍历整个列表
+        self._index = {}
+        # {记录ID: 记录} 和 {类型: 记录列表}，删除和按类型筛选时无需遍历全部记录
+        self._by_id = {}
+        self._by_type = {}
+        # 监控线程写入、界面线程删除和读取，内存中的记录、各索引和数据库操作
+        # 都在同一把可重入锁下进行
+        self._lock = threading.RLock()
+        self._conn = None
+        # 调用close()后不再接受写操作（退出时可能仍有延迟写入或排队的槽函数）
+        self._closed = False
+        # 删除图片文件和临时目录的后台线程（外壳删除较慢，不阻塞调用方线程）
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='clipboard-io')
+        self._io_futures = set()
+        # 待发出的观察者通知，由定时器合并后发出
+        self._notify_timer = None
+        self._notify_lock = threading.Lock()
         self._load_data()
     
+    def _connect(self):
+        """打开数据库连接并创建表结构"""
+        # isolation_level=None：每条语句自动提交，需要时显式BEGIN
+        self._conn = sqlite3.connect(self.db_file, isolation_level=None, check_same_thread=False)
+        # WAL模式下每次写入只追加日志，不重写整个数据库文件
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(_CREATE_TABLE_SQL)
+    
     def _load_data(self):
         """加载数据"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.records = json.load(f)
-                # 确保按时间戳倒序
-                self.records.sort(key=lambda x: x['id'], reverse=True)
-                # 根据存留时间过滤过期记录
-                self._filter_by_age()
-                # 限制数量（仅在设置了最大记录数时）
-                if self.max_records is not None:
-                    self.records = self.records[:self.max_records]
-                # 清理孤立的图片文件
-                self._cleanup_orphaned_images()
+            self._connect()
+            self._migrate_json()
+            # 数据库按id倒序返回，无需再排序（LIMIT -1 表示不限制）
+            limit = self.max_records if self.max_records is not None else -1
+            rows = self._conn.execute(_SELECT_SQL, (limit,)).fetchall()
+            self.records = [
+                {'id': row[0], 'content': row[2], 'type': row[1], 'timestamp': row[3], 'favorited': bool(row[4])}
+                for row in rows
+            ]
+            # 根据存留时间过滤过期记录
+            self._filter_by_age()
+            # 删除数据库中超出最大记录数的记录
+            self._trim_to_max_records()
+            # 清理孤立的图片文件
+            self._cleanup_orphaned_images()
         except Exception as e:
-            print(f"加载数据时出错: {e}")
+            logger.error("加载数据时出错: %s", e)
             self.records = []
+        self._rebuild_lookups()
+    
+    def _rebuild_lookups(self):
+        """根据记录列表重建去重索引、ID映射和类型分组"""
+        self._index = {_index_key(record): record for record in self.records}
+        self._by_id = {record['id']: record for record in self.records}
+        self._by_type = _group_by_type(self.records)
+    
+    def _migrate_json(self):
+        """将旧版本的JSON数据导入数据库（只执行一次，导入后删除JSON文件）"""
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            with open(self.data_file, 'rb') as f:
+                records = _loads(f.read())
+            for record in records:
+                record['timestamp'] = normalize_timestamp(record['timestamp'])
+            # 从新到旧插入，重复内容保留最新的一条
+            records.sort(key=itemgetter('id'), reverse=True)
+            with self._lock:
+                self._conn.execute('BEGIN')
+                try:
+                    self._conn.executemany(_INSERT_IGNORE_SQL, map(_record_params, records))
+                    self._conn.execute('COMMIT')
+                except Exception:
+                    self._conn.execute('ROLLBACK')
+                    raise
+            delete_file_permanently(self.data_file)
+            logger.info("已将 %d 条记录从JSON导入数据库", len(records))
+        except Exception as e:
+            logger.error("导入JSON数据时出错: %s", e)
+    
+    def _delete_rows(self, record_ids):
+        """从数据库中批量删除记录
+        
+        Args:
+            record_ids: 记录ID列表
+        """
+        if not record_ids:
+            return
+        with self._lock:
+            if len(record_ids) == 1:
+                self._conn.execute(_DELETE_SQL, (record_ids[0],))
+                return
+            # 每批一条 DELETE ... IN (...) 语句，放在同一个事务中
+            self._conn.execute('BEGIN')
+            try:
+                for i in range(0, len(record_ids), _DELETE_BATCH_SIZE):
+                    batch = record_ids[i:i + _DELETE_BATCH_SIZE]
+                    placeholders = ','.join('?' * len(batch))
+                    self._conn.execute(f'DELETE FROM records WHERE id IN ({placeholders})', batch)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+    
+    def _submit_io(self, func, *args):
+        """在后台线程中执行文件删除任务
+        
+        Args:
+            func: 要执行的函数
+            *args: 函数参数
+        """
+        try:
+            future = self._io_pool.submit(func, *args)
+        except RuntimeError:
+            # 线程池已在关闭存储时停止，直接在当前线程中执行
+            func(*args)
+            return
+        self._io_futures.add(future)
+        future.add_done_callback(self._io_futures.discard)
+    
+    def _delete_images_async(self, record_list):
+        """在后台删除记录对应的图片文件
+        
+        Args:
+            record_list: 记录列表
+        """
+        image_paths = [record['content'] for record in record_list if record['type'] == 'image']
+        if image_paths:
+            self._submit_io(delete_files_permanently, image_paths)
+    
+    def wait_for_pending_io(self, timeout=None):
+        """等待后台文件删除任务完成
+        
+        Args:
+            timeout: 最长等待秒数，None表示一直等待
+            
+        Returns:
+            是否全部完成
+        """
+        _, not_done = concurrent.futures.wait(list(self._io_futures), timeout=timeout)
+        return not not_done
     
     def _cleanup_orphaned_images(self):
         """清理孤立的图片文件（不在记录中的图片）"""
@@ -130,16 +462,30 @@ class Storage:
                     image_paths_in_records.add(record['content'])
             
             # 遍历 temp_images 目录，删除不在记录中的图片
-            for filename in os.listdir(temp_dir):
-                file_path = os.path.join(temp_dir, filename)
-                if os.path.isfile(file_path) and file_path not in image_paths_in_records:
-                    try:
-                        delete_file_permanently(file_path)
-                        print(f"已清理孤立图片文件: {file_path}")
-                    except Exception as e:
-                        print(f"清理孤立图片文件时出错: {e}")
+            # scandir 的目录项自带文件类型，判断是否为文件时无需再 stat
+            has_thumbs = False
+            orphaned_paths = []
+            with os.scandir(temp_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file(follow_symlinks=False):
+                        has_thumbs = has_thumbs or entry.name == 'thumbs'
+                        continue
+                    if entry.path not in image_paths_in_records:
+                        orphaned_paths.append(entry.path)
+            if orphaned_paths and delete_files_permanently(orphaned_paths):
+                logger.debug("已清理 %d 个孤立图片文件", len(orphaned_paths))
+            
+            # 清理缩略图缓存（缩略图文件名为原图文件名加.png）
+            if has_thumbs:
+                with os.scandir(os.path.join(temp_dir, 'thumbs')) as entries:
+                    for entry in entries:
+                        if os.path.join(temp_dir, entry.name[:-len('.png')]) not in image_paths_in_records:
+                            try:
+                                os.remove(entry.path)
+                            except OSError as e:
+                                logger.warning("清理缩略图缓存时出错: %s", e)
         except Exception as e:
-            print(f"清理孤立图片文件时出错: {e}")
+            logger.error("清理孤立图片文件时出错: %s", e)
     
     def _filter_by_age(self):
         """根据存留时间过滤过期记录"""
@@ -150,57 +496,58 @@ class Storage:
         if max_age_minutes is None:
             return
         
-        import time
-        current_time = time.time()
-        max_age_seconds = max_age_minutes * 60
+        cutoff = time.time() - max_age_minutes * 60
         
-        # 过滤掉超过存留时间的记录
-        filtered_records = []
-        records_to_delete = []
-        
-        for record in self.records:
-            record_time = record['id']
-            age_seconds = current_time - record_time
-            if age_seconds <= max_age_seconds:
-                filtered_records.append(record)
-            else:
-                records_to_delete.append(record)
+        # 记录按id（创建时间）倒序排列，过期记录都在末尾，二分查找到边界即可
+        keep_count = _count_before_cutoff(self.records, cutoff)
+        if keep_count == len(self.records):
+            return
+        records_to_delete = self.records[keep_count:]
         
-        # 删除过期记录对应的图片文件
+        # 在后台删除过期记录对应的图片文件
         for record in records_to_delete:
-            if record['type'] == 'image':
-                try:
-                    image_path = record['content']
-                    if os.path.exists(image_path):
-                        delete_file_permanently(image_path)
-                        print(f"已删除过期图片文件: {image_path}")
-                except Exception as e:
-                    print(f"删除过期图片文件时出错: {e}")
+            self._index.pop(_index_key(record), None)
+            self._by_id.pop(record['id'], None)
+        self._delete_images_async(records_to_delete)
         
-        self.records = filtered_records
+        del self.records[keep_count:]
+        # 类型分组同样按时间倒序排列，只需截掉末尾的过期记录
+        for same_type in self._by_type.values():
+            del same_type[_count_before_cutoff(same_type, cutoff):]
+        # 过期记录的id都小于截止时间，一条语句即可删除
+        try:
+            with self._lock:
+                self._conn.execute(_DELETE_BEFORE_SQL, (cutoff,))
+        except Exception as e:
+            logger.error("删除过期记录时出错: %s", e)
     
-    def _save_data(self):
-        """保存数据"""
+    def _trim_to_max_records(self):
+        """删除超出最大记录数的记录及其图片文件（仅在设置了最大记录数时）"""
+        if self.max_records is None:
+            return
+        
         try:
-            # 限制数量，并删除超出限制的图片文件（仅在设置了最大记录数时）
-            if self.max_records is not None and len(self.records) > self.max_records:
-                records_to_delete = self.records[self.max_records:]
-                for record in records_to_delete:
-                    if record['type'] == 'image':
-                        try:
-                            image_path = record['content']
-                            if os.path.exists(image_path):
-                                delete_file_permanently(image_path)
-                                print(f"已删除超出限制的图片文件: {image_path}")
-                        except Exception as e:
-                            print(f"删除超出限制的图片文件时出错: {e}")
-                
-                self.records = self.records[:self.max_records]
+            # 内存中的记录被截断时，数据库里可能还有更多更旧的记录，一并删除
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT id, type, content FROM records ORDER BY id DESC LIMIT -1 OFFSET ?',
+                    (self.max_records,)
+                ).fetchall()
+            if not rows:
+                return
             
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.records, f, ensure_ascii=False, indent=2)
+            image_paths = [content for record_id, record_type, content in rows if record_type == 'image']
+            if image_paths:
+                self._submit_io(delete_files_permanently, image_paths)
+            
+            for record in self.records[self.max_records:]:
+                self._index.pop(_index_key(record), None)
+                self._by_id.pop(record['id'], None)
+            self.records = self.records[:self.max_records]
+            self._by_type = _group_by_type(self.records)
+            self._delete_rows([row[0] for row in rows])
         except Exception as e:
-            print(f"保存数据时出错: {e}")
+            logger.error("删除超出限制的记录时出错: %s", e)
     
     def add_record(self, record):
         """添加记录
@@ -208,30 +555,47 @@ class Storage:
         Args:
             record: 记录字典
         """
-        print(f"正在添加记录: {record['content'][:50]}..." if len(record['content']) > 50 else f"正在添加记录: {record['content']}")
-        # 检查是否重复
-        for existing_record in self.records:
-            if existing_record['content'] == record['content'] and existing_record['type'] == record['type']:
+        with self._lock:
+            if self._closed:
+                return
+            logger.debug("正在添加记录: %.50s", record['content'])
+            record['timestamp'] = normalize_timestamp(record['timestamp'])
+            # 写入数据库（重复内容由唯一约束合并为一条，只更新时间戳）
+            try:
+                self._conn.execute(_UPSERT_SQL, _record_params(record))
+            except Exception as e:
+                logger.error("保存记录时出错: %s", e)
+            
+            # 检查是否重复
+            key = _index_key(record)
+            existing_record = self._index.get(key)
+            if existing_record is not None:
                 # 更新时间戳
+                del self._by_id[existing_record['id']]
                 existing_record['id'] = record['id']
                 existing_record['timestamp'] = record['timestamp']
+                self._by_id[record['id']] = existing_record
                 # 移到最前面
-                self.records.remove(existing_record)
-                self.records.insert(0, existing_record)
-                self._save_data()
-                print("更新了现有记录")
+                if self.records[0] is not existing_record:
+                    self.records.remove(existing_record)
+                    self.records.insert(0, existing_record)
+                    same_type = self._by_type[existing_record['type']]
+                    same_type.remove(existing_record)
+                    same_type.insert(0, existing_record)
+                logger.debug("更新了现有记录")
                 return
-        
-        # 添加新记录
-        self.records.insert(0, record)
-        # 根据存留时间过滤过期记录
-        self._filter_by_age()
-        # 限制数量（仅在设置了最大记录数时）
-        if self.max_records is not None:
-            self.records = self.records[:self.max_records]
-        # 保存
-        self._save_data()
-        print(f"添加了新记录，当前记录数: {len(self.records)}")
+            
+            # 添加新记录
+            self.records.insert(0, record)
+            self._index[key] = record
+            self._by_id[record['id']] = record
+            self._by_type.setdefault(record['type'], []).insert(0, record)
+            # 根据存留时间过滤过期记录
+            self._filter_by_age()
+            # 限制数量（仅在设置了最大记录数时）
+            if self.max_records is not None and len(self.records) > self.max_records:
+                self._trim_to_max_records()
+            logger.debug("添加了新记录，当前记录数: %d", len(self.records))
     
     def update_config(self, config):
         """更新配置
@@ -239,50 +603,63 @@ class Storage:
         Args:
             config: 新的配置实例
         """
-        self.config = config
-        self.max_records = config.get_max_records()
-        
-        # 获取更新前的记录数
-        old_count = len(self.records)
-        
-        # 根据新配置过滤记录
-        self._filter_by_age()
-        
-        # 删除超出最大记录数的记录及其图片文件（仅在设置了最大记录数时）
-        if self.max_records is not None and len(self.records) > self.max_records:
-            records_to_delete = self.records[self.max_records:]
-            for record in records_to_delete:
-                if record['type'] == 'image':
-                    try:
-                        image_path = record['content']
-                        if os.path.exists(image_path):
-                            delete_file_permanently(image_path)
-                            print(f"已删除超出限制的图片文件: {image_path}")
-                    except Exception as e:
-                        print(f"删除超出限制的图片文件时出错: {e}")
+        with self._lock:
+            if self._closed:
+                return
+            self.config = config
+            self.max_records = config.get_max_records()
             
-            self.records = self.records[:self.max_records]
-        
-        # 如果记录数减少了，需要保存
-        if len(self.records) < old_count:
-            self._save_data()
+            # 根据新配置过滤记录
+            self._filter_by_age()
+            
+            # 删除超出最大记录数的记录及其图片文件
+            self._trim_to_max_records()
     
-    def get_records(self, filter_type=None):
+    def get_records(self, filter_type=None, search_term=None):
         """获取记录
         
         Args:
             filter_type: 过滤类型 (text/file/image)
+            search_term: 搜索关键词（不区分大小写）
             
         Returns:
             记录列表
         """
-        result = self.records
-        
-        # 过滤类型
-        if filter_type:
-            result = [r for r in result if r['type'] == filter_type]
+        with self._lock:
+            needle = search_term.casefold() if search_term else None
+            
+            # 过滤类型和搜索词在一次遍历中完成
+            if filter_type:
+                # 类型分组已按时间倒序排列，直接取用
+                records = self._by_type.get(filter_type, [])
+                if needle:
+                    folded = self._get_folded
+                    return [r for r in records if needle in folded(r['content'])]
+                # 返回副本，调用方在锁外遍历时不受其他线程修改的影响
+                return list(records)
+            if needle:
+                folded = self._get_folded
+                return [r for r in self.records if needle in folded(r['content'])]
+            return list(self.records)
+    
+    def _get_folded(self, content):
+        """获取内容的大小写折叠形式（缓存，每条内容只折叠一次）
         
-        return result
+        Args:
+            content: 记录内容
+            
+        Returns:
+            折叠后的内容
+        """
+        folded = self._folded_contents.get(content)
+        if folded is None:
+            # 缓存明显多于记录数时，丢弃已不存在的内容
+            if len(self._folded_contents) > 2 * len(self.records):
+                contents = {r['content'] for r in self.records}
+                self._folded_contents = {k: v for k, v in self._folded_contents.items() if k in contents}
+            folded = content.casefold()
+            self._folded_contents[content] = folded
+        return folded
     
     def delete_record(self, record_id):
         """删除记录
@@ -290,25 +667,38 @@ class Storage:
         Args:
             record_id: 记录ID
         """
-        # 先找到要删除的记录
-        record_to_delete = None
-        for record in self.records:
-            if record['id'] == record_id:
-                record_to_delete = record
-                break
-        
-        # 如果是图片类型，删除对应的图片文件
-        if record_to_delete and record_to_delete['type'] == 'image':
+        self.delete_records([record_id])
+    
+    def delete_records(self, record_ids):
+        """批量删除记录（通过ID映射查找，数据库中一条语句批量删除）
+        
+        Args:
+            record_ids: 记录ID的可迭代对象
+        """
+        with self._lock:
+            if self._closed:
+                return
+            record_ids = set(record_ids)
+            # 通过ID映射直接取出要删除的记录，不存在的ID无需遍历列表
+            records_to_delete = [self._by_id.pop(record_id) for record_id in record_ids if record_id in self._by_id]
+            if not records_to_delete:
+                return
+            
+            # 在后台删除对应的图片文件
+            for record in records_to_delete:
+                self._index.pop(_index_key(record), None)
+            self._delete_images_async(records_to_delete)
+            
+            # 删除记录（只需重建受影响类型的分组）
+            self.records = [record for record in self.records if record['id'] not in record_ids]
+            for record_type in {record['type'] for record in records_to_delete}:
+                self._by_type[record_type] = [
+                    record for record in self._by_type[record_type] if record['id'] not in record_ids
+                ]
             try:
-                image_path = record_to_delete['content']
-                if os.path.exists(image_path):
-                    delete_file_permanently(image_path)
+                self._delete_rows([record['id'] for record in records_to_delete])
             except Exception as e:
-                print(f"删除图片文件时出错: {e}")
-        
-        # 删除记录
-        self.records = [r for r in self.records if r['id'] != record_id]
-        self._save_data()
+                logger.error("删除记录时出错: %s", e)
     
     def delete_multiple(self, record_ids):
         """批量删除记录
@@ -316,58 +706,82 @@ class Storage:
         Args:
             record_ids: 记录ID列表
         """
-        # 找到要删除的记录
-        records_to_delete = []
-        for record in self.records:
-            if record['id'] in record_ids:
-                records_to_delete.append(record)
-        
-        # 删除对应的图片文件
-        for record in records_to_delete:
-            if record['type'] == 'image':
-                try:
-                    image_path = record['content']
-                    if os.path.exists(image_path):
-                        delete_file_permanently(image_path)
-                except Exception as e:
-                    print(f"删除图片文件时出错: {e}")
-        
-        # 删除记录
-        self.records = [r for r in self.records if r['id'] not in record_ids]
-        self._save_data()
+        self.delete_records(record_ids)
     
     def clear_all(self):
-        """清空所有记录"""
-        # 删除所有图片文件
-        for record in self.records:
-            if record['type'] == 'image':
-                try:
-                    image_path = record['content']
-                    if os.path.exists(image_path):
-                        delete_file_permanently(image_path)
-                except Exception as e:
-                    print(f"删除图片文件时出错: {e}")
-        
-        # 清空记录
-        self.records = []
-        self._save_data()
-        
-        # 删除JSON数据文件
-        try:
-            if os.path.exists(self.data_file):
-                delete_file_permanently(self.data_file)
-        except Exception as e:
-            print(f"删除数据文件时出错: {e}")
+        """清空所有记录
         
-        # 删除临时图片目录
-        try:
+        内存中的记录和数据库立即清空，图片文件和临时目录在后台删除。
+        """
+        with self._lock:
+            if self._closed:
+                return
+            image_paths = [record['content'] for record in self.records if record['type'] == 'image']
+            
+            # 清空记录
+            self.records = []
+            self._rebuild_lookups()
+            
+            # 关闭连接后删除数据库文件（含WAL日志），再重新创建空数据库
+            try:
+                if self._conn is not None:
+                    self._conn.close()
+            except Exception as e:
+                logger.error("关闭数据库时出错: %s", e)
+            # 数据库文件直接删除（WAL日志在连接正常关闭后通常已不存在，无需经过外壳操作）
+            for path in (self.db_file, self.db_file + '-wal', self.db_file + '-shm', self.data_file):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error("删除数据库文件 %s 时出错: %s", path, e)
+            try:
+                self._connect()
+            except Exception as e:
+                logger.error("重新创建数据库时出错: %s", e)
+            
+            # 临时图片目录先改名再在后台删除：之后监控器保存的新图片会写入重新创建的
+            # 目录，不会被后台删除误删
             temp_dir = os.path.join(os.path.dirname(self.data_file), 'temp_images')
-            if os.path.exists(temp_dir):
-                import shutil
-                shutil.rmtree(temp_dir)
-                print(f"已删除临时目录: {temp_dir}")
-        except Exception as e:
-            print(f"删除临时目录时出错: {e}")
+            trash_dir = f'{temp_dir}.deleting-{os.getpid()}-{time.time_ns()}'
+            try:
+                os.rename(temp_dir, trash_dir)
+            except FileNotFoundError:
+                trash_dir = None
+            except OSError as e:
+                # 改名失败时只删除快照中的图片，保留目录
+                logger.error("移走临时目录时出错: %s", e)
+                trash_dir = None
+            if trash_dir is not None:
+                # 目录内的图片随目录一起删除，只需单独删除目录外的图片
+                prefix = temp_dir + os.sep
+                image_paths = [path for path in image_paths if not path.startswith(prefix)]
+            self._submit_io(_delete_files_and_dir, image_paths, trash_dir)
+    
+    def close(self):
+        """关闭数据库连接
+        
+        退出前将WAL日志合并回数据库文件并截断日志，下次启动无需回放日志。
+        后台线程不再接受新的删除任务，尚未发出的观察者通知被取消，
+        之后的添加、删除等写操作直接返回。
+        """
+        with self._lock:
+            self._closed = True
+        with self._notify_lock:
+            if self._notify_timer is not None:
+                self._notify_timer.cancel()
+                self._notify_timer = None
+        self._io_pool.shutdown(wait=False)
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                self._conn.close()
+            except Exception as e:
+                logger.error("关闭数据库时出错: %s", e)
+            self._conn = None
     
     def add_observer(self, observer):
         """添加观察者
@@ -388,8 +802,21 @@ class Storage:
             self.observers.remove(observer)
     
     def notify_change(self):
-        """通知所有观察者"""
-        for observer in self.observers:
+        """通知所有观察者
+        
+        通知在 NOTIFY_DELAY 秒后发出，期间的多次变更合并为一次通知。
+        """
+        with self._notify_lock:
+            if self._notify_timer is None:
+                self._notify_timer = threading.Timer(NOTIFY_DELAY, self._do_notify)
+                self._notify_timer.daemon = True
+                self._notify_timer.start()
+    
+    def _do_notify(self):
+        """向所有观察者发出合并后的变更通知"""
+        with self._notify_lock:
+            self._notify_timer = None
+        for observer in list(self.observers):
             try:
                 # 优先调用on_storage_change方法
                 if hasattr(observer, 'on_storage_change'):
@@ -398,4 +825,4 @@ class Storage:
                 elif hasattr(observer, 'update'):
                     observer.update()
             except Exception as e:
-                print(f"通知观察者时出错: {e}")
+                logger.error("通知观察者时出错: %s", e)